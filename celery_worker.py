@@ -16,6 +16,7 @@ import json
 from src.api.backend.services.analyzer_service import AnalyzerService
 from src.api.backend.crud import AnalysisJobCRUD, BatchCRUD
 from src.api.backend.database import get_supabase_admin_client
+from src.api.backend.utils.cache import cache
 
 import subprocess
 
@@ -92,6 +93,8 @@ def create_snapshot_from_team(team_id: str, run_number: int, batch_run_id: str):
         }
         
         supabase.table('analysis_snapshots').insert(snapshot_data).execute()
+        # Invalidate the cached weekly progress series
+        cache.incr(f"hackeval:rev:progress:{team_id}")
         logger.info(f"✅ Snapshot created: team={team_id}, run={run_number}")
         
     except Exception as e:
@@ -30,6 +30,7 @@ from src.api.backend.routers import (
     alerts,
     debug  # Debug/diagnostic endpoints
 )
+from src.api.backend.utils.logger import start_queue_logging
 
 # Create FastAPI app
 app = FastAPI(
@@ -157,6 +158,9 @@ async def health_check():
 @app.on_event("startup")
 async def startup_event():
     """Run on application startup"""
+    # Log records from request handlers are written by a background thread
+    app.state.log_listener = start_queue_logging()
+    
     print("\n" + "="*60)
     print("🚀 Repository Analysis API Starting...")
     print("="*60)
@@ -168,6 +172,8 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
+    app.state.log_listener.stop()
+    
     print("\n" + "="*60)
     print("👋 Repository Analysis API Shutting Down...")
     print("="*60 + "\n")
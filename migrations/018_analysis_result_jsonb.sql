@@ -0,0 +1,21 @@
+-- Migration: Store teams.analysis_result as JSONB
+-- Date: 2026-10-16
+-- Description: PostgREST returns JSONB as native objects, so the reports
+-- endpoints no longer have to json.loads() a text blob per team per request
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'teams' AND column_name = 'analysis_result'
+    ) THEN
+        ALTER TABLE teams ADD COLUMN analysis_result JSONB;
+    ELSIF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'teams' AND column_name = 'analysis_result'
+        AND data_type <> 'jsonb'
+    ) THEN
+        ALTER TABLE teams
+        ALTER COLUMN analysis_result TYPE JSONB USING analysis_result::jsonb;
+    END IF;
+END $$;
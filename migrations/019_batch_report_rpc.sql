@@ -0,0 +1,52 @@
+-- Migration: get_batch_report_data RPC
+-- Date: 2026-10-16
+-- Description: Returns the batch header and its report columns for every team
+-- in one round trip. The caller passes the batches.updated_at it last rendered;
+-- when that still matches, "teams" comes back NULL and the cached report is
+-- reused without shipping any team rows. Returns NULL if the batch is missing.
+
+CREATE OR REPLACE FUNCTION get_batch_report_data(
+    p_batch_id UUID,
+    p_known_updated_at TIMESTAMPTZ DEFAULT NULL,
+    p_include_students BOOLEAN DEFAULT FALSE
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'batch', jsonb_build_object(
+            'id', b.id,
+            'name', b.name,
+            'updated_at', b.updated_at
+        ),
+        'teams', CASE
+            WHEN p_known_updated_at IS NOT NULL AND p_known_updated_at = b.updated_at THEN NULL
+            ELSE COALESCE((
+                SELECT jsonb_agg(jsonb_build_object(
+                    'id', t.id,
+                    'team_name', t.team_name,
+                    'mentor_id', t.mentor_id,
+                    'health_status', t.health_status,
+                    'last_analyzed_at', t.last_analyzed_at,
+                    'analysis_result', t.analysis_result,
+                    'students', CASE WHEN p_include_students THEN COALESCE((
+                        SELECT jsonb_agg(jsonb_build_object(
+                            'name', s.name,
+                            'email', s.email,
+                            'admin_grade', s.admin_grade,
+                            'admin_feedback', s.admin_feedback,
+                            'grading_details', s.grading_details
+                        ))
+                        FROM students s
+                        WHERE s.team_id = t.id
+                    ), '[]'::jsonb) END
+                ))
+                FROM teams t
+                WHERE t.batch_id = b.id
+            ), '[]'::jsonb)
+        END
+    )
+    FROM batches b
+    WHERE b.id = p_batch_id;
+$$;
@@ -0,0 +1,85 @@
+-- Migration: Order batch report teams in Postgres
+-- Date: 2026-10-16
+-- Description: Adds a stored generated column holding analysis_result.totalScore
+-- (NULL when missing or not a number), indexes it per batch, and has
+-- get_batch_report_data return teams already ranked so the endpoint assigns
+-- ranks while building rows instead of sorting in Python.
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'teams' AND column_name = 'analysis_total_score'
+    ) THEN
+        ALTER TABLE teams ADD COLUMN analysis_total_score NUMERIC GENERATED ALWAYS AS (
+            CASE WHEN jsonb_typeof(analysis_result->'totalScore') = 'number'
+                THEN (analysis_result->>'totalScore')::numeric END
+        ) STORED;
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_teams_batch_analysis_total_score
+    ON teams(batch_id, analysis_total_score DESC NULLS LAST);
+
+CREATE OR REPLACE FUNCTION get_batch_report_data(
+    p_batch_id UUID,
+    p_known_updated_at TIMESTAMPTZ DEFAULT NULL,
+    p_include_students BOOLEAN DEFAULT FALSE
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'batch', jsonb_build_object(
+            'id', b.id,
+            'name', b.name,
+            'updated_at', b.updated_at
+        ),
+        'teams', CASE WHEN v.fresh THEN NULL ELSE COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'id', t.id,
+                'team_name', t.team_name,
+                'mentor_id', t.mentor_id,
+                'health_status', t.health_status,
+                'last_analyzed_at', t.last_analyzed_at,
+                'analysis_result', t.analysis_result,
+                'students', CASE WHEN p_include_students THEN COALESCE((
+                    SELECT jsonb_agg(jsonb_build_object(
+                        'name', s.name,
+                        'email', s.email,
+                        'admin_grade', s.admin_grade,
+                        'admin_feedback', s.admin_feedback,
+                        'grading_details', s.grading_details
+                    ))
+                    FROM students s
+                    WHERE s.team_id = t.id
+                ), '[]'::jsonb) END
+            ) ORDER BY t.analysis_total_score DESC NULLS LAST)
+            FROM teams t
+            WHERE t.batch_id = b.id
+        ), '[]'::jsonb) END,
+        'aggregates', CASE WHEN v.fresh THEN NULL ELSE (
+            SELECT jsonb_build_object(
+                'averageScore', COALESCE(avg(a.total_score) FILTER (WHERE a.total_score > 0), 0),
+                'averageAiUsage', COALESCE(avg(a.ai_percentage) FILTER (WHERE a.ai_percentage > 0), 0),
+                'totalSecurityIssues', COALESCE(sum(a.security_issues), 0)
+            )
+            FROM (
+                SELECT
+                    t.analysis_total_score AS total_score,
+                    CASE WHEN jsonb_typeof(t.analysis_result->'aiGeneratedPercentage') = 'number'
+                        THEN (t.analysis_result->>'aiGeneratedPercentage')::numeric END AS ai_percentage,
+                    CASE WHEN jsonb_typeof(t.analysis_result->'securityIssues') = 'array'
+                        THEN jsonb_array_length(t.analysis_result->'securityIssues') ELSE 0 END AS security_issues
+                FROM teams t
+                WHERE t.batch_id = b.id
+            ) a
+        ) END
+    )
+    FROM batches b
+    CROSS JOIN LATERAL (
+        SELECT p_known_updated_at IS NOT NULL AND p_known_updated_at = b.updated_at AS fresh
+    ) v
+    WHERE b.id = p_batch_id;
+$$;
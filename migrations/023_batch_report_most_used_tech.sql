@@ -0,0 +1,84 @@
+-- Migration: Compute the batch report's most used tech in Postgres
+-- Date: 2026-10-16
+-- Description: get_batch_report_data's aggregates gain mostUsedTech, counted
+-- by unnesting every team's analysis_result.frameworks and grouping, so the
+-- endpoint no longer tallies frameworks in Python. Ties go to the tech used
+-- by the higher-ranked team, then alphabetically.
+
+CREATE OR REPLACE FUNCTION get_batch_report_data(
+    p_batch_id UUID,
+    p_known_updated_at TIMESTAMPTZ DEFAULT NULL,
+    p_include_students BOOLEAN DEFAULT FALSE
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'batch', jsonb_build_object(
+            'id', b.id,
+            'name', b.name,
+            'updated_at', b.updated_at
+        ),
+        'teams', CASE WHEN v.fresh THEN NULL ELSE COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'id', t.id,
+                'team_name', t.team_name,
+                'mentor_id', t.mentor_id,
+                'health_status', t.health_status,
+                'last_analyzed_at', t.last_analyzed_at,
+                'analysis_result', t.analysis_result,
+                'students', CASE WHEN p_include_students THEN COALESCE(ts.students, '[]'::jsonb) END
+            ) ORDER BY t.analysis_total_score DESC NULLS LAST)
+            FROM teams t
+            LEFT JOIN (
+                SELECT s.team_id, jsonb_agg(jsonb_build_object(
+                    'name', s.name,
+                    'email', s.email,
+                    'admin_grade', s.admin_grade,
+                    'admin_feedback', s.admin_feedback,
+                    'grading_details', s.grading_details
+                )) AS students
+                FROM students s
+                JOIN teams st ON st.id = s.team_id
+                WHERE p_include_students AND st.batch_id = p_batch_id
+                GROUP BY s.team_id
+            ) ts ON ts.team_id = t.id
+            WHERE t.batch_id = b.id
+        ), '[]'::jsonb) END,
+        'aggregates', CASE WHEN v.fresh THEN NULL ELSE (
+            SELECT jsonb_build_object(
+                'averageScore', COALESCE(avg(a.total_score) FILTER (WHERE a.total_score > 0), 0),
+                'averageAiUsage', COALESCE(avg(a.ai_percentage) FILTER (WHERE a.ai_percentage > 0), 0),
+                'totalSecurityIssues', COALESCE(sum(a.security_issues), 0),
+                'mostUsedTech', (
+                    SELECT f.tech
+                    FROM teams t
+                    CROSS JOIN LATERAL jsonb_array_elements_text(
+                        CASE WHEN jsonb_typeof(t.analysis_result->'frameworks') = 'array'
+                            THEN t.analysis_result->'frameworks' ELSE '[]'::jsonb END
+                    ) AS f(tech)
+                    WHERE t.batch_id = b.id AND f.tech IS NOT NULL
+                    GROUP BY f.tech
+                    ORDER BY count(*) DESC, max(t.analysis_total_score) DESC NULLS LAST, f.tech
+                    LIMIT 1
+                )
+            )
+            FROM (
+                SELECT
+                    t.analysis_total_score AS total_score,
+                    CASE WHEN jsonb_typeof(t.analysis_result->'aiGeneratedPercentage') = 'number'
+                        THEN (t.analysis_result->>'aiGeneratedPercentage')::numeric END AS ai_percentage,
+                    CASE WHEN jsonb_typeof(t.analysis_result->'securityIssues') = 'array'
+                        THEN jsonb_array_length(t.analysis_result->'securityIssues') ELSE 0 END AS security_issues
+                FROM teams t
+                WHERE t.batch_id = b.id
+            ) a
+        ) END
+    )
+    FROM batches b
+    CROSS JOIN LATERAL (
+        SELECT p_known_updated_at IS NOT NULL AND p_known_updated_at = b.updated_at AS fresh
+    ) v
+    WHERE b.id = p_batch_id;
+$$;
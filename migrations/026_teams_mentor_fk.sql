@@ -0,0 +1,17 @@
+-- Migration: Foreign key from teams.mentor_id to users
+-- Date: 2026-10-16
+-- Description: teams.mentor_id had no foreign key, so list_teams resolved
+-- mentor names with a separate users query. The constraint lets PostgREST
+-- embed the mentor (mentor:users!teams_mentor_id_fkey(...)) in the teams
+-- select. NOT VALID skips checking existing rows, so teams that still
+-- point at a removed user do not block the migration; new writes are checked.
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'teams_mentor_id_fkey'
+    ) THEN
+        ALTER TABLE teams ADD CONSTRAINT teams_mentor_id_fkey
+            FOREIGN KEY (mentor_id) REFERENCES users(id) ON DELETE SET NULL NOT VALID;
+    END IF;
+END $$;
@@ -0,0 +1,107 @@
+-- Migration: list_teams_page RPC
+-- Date: 2026-10-16
+-- Description: list_teams ran a search prefilter over every team, a separate
+-- count query and then the page query with count="exact" (so the filtered
+-- set was counted twice), and natural-sorted team names only within the
+-- page. list_teams_page applies the filters, search, ordering and paging in
+-- one statement and returns {"total", "teams"}, with the mentor name joined
+-- in. The total is an exact count of the filtered rows, which the batch- or
+-- mentor-scoped filters keep small. A pg_class.reltuples estimate would
+-- count the whole table, not the filtered list. Team names sort naturally
+-- ("Team 2" before "Team 10") across pages. The ILIKE search uses
+-- idx_teams_name_trgm (010).
+
+CREATE INDEX IF NOT EXISTS idx_teams_batch_status
+    ON teams(batch_id, status);
+
+CREATE OR REPLACE FUNCTION list_teams_page(
+    p_batch_id UUID DEFAULT NULL,
+    p_mentor_id UUID DEFAULT NULL,
+    p_assigned_to UUID DEFAULT NULL,
+    p_status TEXT DEFAULT NULL,
+    p_search TEXT DEFAULT NULL,
+    p_sort TEXT DEFAULT 'team_name',
+    p_limit INTEGER DEFAULT 20,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    v_direction TEXT := CASE WHEN left(p_sort, 1) = '-' THEN 'DESC' ELSE 'ASC' END;
+    v_sort TEXT := ltrim(p_sort, '-');
+    v_order TEXT;
+    v_result JSONB;
+BEGIN
+    -- p_sort is whitelisted before it reaches the dynamic ORDER BY
+    IF v_sort IN ('status', 'health_status', 'created_at', 'updated_at',
+                  'last_activity', 'last_analyzed_at', 'total_score') THEN
+        v_order := format('t.%I %s', v_sort, v_direction);
+    ELSE
+        -- Natural order on the first number in the name; names without one
+        -- come last ascending and first descending
+        v_order := format(
+            'substring(t.team_name from ''\d+'')::numeric %1$s, t.team_name %1$s',
+            v_direction
+        );
+    END IF;
+
+    EXECUTE format($query$
+        WITH filtered AS (
+            SELECT t.*
+            FROM teams t
+            WHERE ($1 IS NULL OR t.batch_id = $1)
+              AND ($2 IS NULL OR t.mentor_id = $2)
+              AND ($3 IS NULL OR t.id IN (
+                  SELECT a.team_id FROM mentor_team_assignments a WHERE a.mentor_id = $3
+              ))
+              AND (CASE
+                  WHEN $4 IS NULL THEN TRUE
+                  WHEN $4 = 'unassigned' THEN t.mentor_id IS NULL
+                  ELSE t.status = $4
+              END)
+              AND ($5 IS NULL
+                   OR t.team_name ILIKE '%%' || $5 || '%%'
+                   OR t.repo_url ILIKE '%%' || $5 || '%%')
+        )
+        SELECT jsonb_build_object(
+            'total', (SELECT count(*) FROM filtered),
+            'teams', COALESCE((
+                SELECT jsonb_agg(page.team ORDER BY page.position)
+                FROM (
+                    SELECT
+                        jsonb_build_object(
+                            'id', t.id,
+                            'team_name', t.team_name,
+                            'batch_id', t.batch_id,
+                            'mentor_id', t.mentor_id,
+                            'status', t.status,
+                            'health_status', t.health_status,
+                            'last_activity', t.last_activity,
+                            'created_at', t.created_at,
+                            'updated_at', t.updated_at,
+                            'repo_url', t.repo_url,
+                            'metadata', t.metadata,
+                            'total_score', t.total_score,
+                            'quality_score', t.quality_score,
+                            'security_score', t.security_score,
+                            'analyzed_at', t.analyzed_at,
+                            'last_analyzed_at', t.last_analyzed_at,
+                            'mentor_name', COALESCE(u.full_name, u.email)
+                        ) AS team,
+                        row_number() OVER (ORDER BY %s, t.id) AS position
+                    FROM filtered t
+                    LEFT JOIN users u ON u.id = t.mentor_id
+                    ORDER BY position
+                    LIMIT $6 OFFSET $7
+                ) page
+            ), '[]'::jsonb)
+        )
+    $query$, v_order)
+    INTO v_result
+    USING p_batch_id, p_mentor_id, p_assigned_to, p_status, p_search, p_limit, p_offset;
+
+    RETURN v_result;
+END;
+$$;
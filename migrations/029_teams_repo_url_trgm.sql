@@ -0,0 +1,13 @@
+-- Migration: Trigram index for repo URL search
+-- Date: 2026-10-16
+-- Description: list_teams_page matches the search term against team_name OR
+-- repo_url with ILIKE '%term%'. team_name is covered by idx_teams_name_trgm
+-- (010), but without a matching index on repo_url the OR still falls back to
+-- a sequential scan of teams. With both trigram indexes Postgres can combine
+-- them in a BitmapOr. The endpoint escapes LIKE wildcards in the term, so
+-- "%" and "_" match literally instead of widening the scan.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_teams_repo_url_trgm
+    ON teams USING gin(repo_url gin_trgm_ops);
@@ -0,0 +1,29 @@
+-- Migration: Delete teams and their dependent rows in one call
+-- Date: 2026-10-16
+-- Description: Clearing a batch's teams sent one DELETE per child table, each
+-- with every team id inlined as id=in.(...) in the URL: nine round-trips, no
+-- transaction around them, and a query string that grows with the batch.
+-- delete_teams_cascade takes the ids as one uuid[] parameter, matches them
+-- with = ANY(), and removes the child rows and the teams in a single
+-- transaction, children first.
+
+CREATE OR REPLACE FUNCTION delete_teams_cascade(p_team_ids UUID[])
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_deleted INTEGER;
+BEGIN
+    DELETE FROM analysis_jobs WHERE team_id = ANY(p_team_ids);
+    DELETE FROM analysis_snapshots WHERE team_id = ANY(p_team_ids);
+    DELETE FROM issues WHERE team_id = ANY(p_team_ids);
+    DELETE FROM project_comments WHERE team_id = ANY(p_team_ids);
+    DELETE FROM tech_stack WHERE team_id = ANY(p_team_ids);
+    DELETE FROM team_members WHERE team_id = ANY(p_team_ids);
+    DELETE FROM mentor_team_assignments WHERE team_id = ANY(p_team_ids);
+    DELETE FROM students WHERE team_id = ANY(p_team_ids);
+    DELETE FROM teams WHERE id = ANY(p_team_ids);
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$;
@@ -0,0 +1,119 @@
+-- Migration: Batch and student count in list_teams_page
+-- Date: 2026-10-16
+-- Description: list_teams fetched a page from list_teams_page and then made
+-- two more requests to attach each team's batch and count its students.
+-- The page rows now carry both: the batch as a nested "batches" object (null
+-- when the team has none) and student_count from idx_students_team_id, so a
+-- page of teams is a single round-trip. Signature and ordering are
+-- unchanged from 028.
+
+CREATE OR REPLACE FUNCTION list_teams_page(
+    p_batch_id UUID DEFAULT NULL,
+    p_mentor_id UUID DEFAULT NULL,
+    p_assigned_to UUID DEFAULT NULL,
+    p_status TEXT DEFAULT NULL,
+    p_search TEXT DEFAULT NULL,
+    p_sort TEXT DEFAULT 'team_name',
+    p_limit INTEGER DEFAULT 20,
+    p_offset INTEGER DEFAULT 0,
+    p_after_name TEXT DEFAULT NULL,
+    p_after_id UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    v_direction TEXT := CASE WHEN left(p_sort, 1) = '-' THEN 'DESC' ELSE 'ASC' END;
+    v_sort TEXT := ltrim(p_sort, '-');
+    v_filters TEXT := $filters$
+            ($1 IS NULL OR t.batch_id = $1)
+        AND ($2 IS NULL OR t.mentor_id = $2)
+        AND ($3 IS NULL OR t.id IN (
+            SELECT a.team_id FROM mentor_team_assignments a WHERE a.mentor_id = $3
+        ))
+        AND (CASE
+            WHEN $4 IS NULL THEN TRUE
+            WHEN $4 = 'unassigned' THEN t.mentor_id IS NULL
+            ELSE t.status = $4
+        END)
+        AND ($5 IS NULL
+             OR t.team_name ILIKE '%' || $5 || '%'
+             OR t.repo_url ILIKE '%' || $5 || '%')
+    $filters$;
+    v_keyset TEXT := 'TRUE';
+    v_order TEXT;
+    v_result JSONB;
+BEGIN
+    -- p_sort is whitelisted before it reaches the dynamic ORDER BY
+    IF v_sort IN ('status', 'health_status', 'created_at', 'updated_at',
+                  'last_activity', 'last_analyzed_at', 'total_score') THEN
+        v_order := format('t.%I %s, t.id', v_sort, v_direction);
+    ELSE
+        v_order := format(
+            'team_name_sort_key(t.team_name) %1$s, t.team_name %1$s, t.id %1$s',
+            v_direction
+        );
+        -- The keyset cursor applies to the team-name order only
+        IF p_after_id IS NOT NULL THEN
+            v_keyset := format(
+                '(team_name_sort_key(t.team_name), t.team_name, t.id) %s '
+                '(team_name_sort_key($8), $8, $9)',
+                CASE WHEN v_direction = 'DESC' THEN '<' ELSE '>' END
+            );
+        END IF;
+    END IF;
+
+    EXECUTE format($query$
+        SELECT jsonb_build_object(
+            'total', (SELECT count(*) FROM teams t WHERE %1$s),
+            'teams', COALESCE((
+                SELECT jsonb_agg(page.team ORDER BY page.position)
+                FROM (
+                    SELECT
+                        jsonb_build_object(
+                            'id', t.id,
+                            'team_name', t.team_name,
+                            'batch_id', t.batch_id,
+                            'mentor_id', t.mentor_id,
+                            'status', t.status,
+                            'health_status', t.health_status,
+                            'last_activity', t.last_activity,
+                            'created_at', t.created_at,
+                            'updated_at', t.updated_at,
+                            'repo_url', t.repo_url,
+                            'metadata', t.metadata,
+                            'total_score', t.total_score,
+                            'quality_score', t.quality_score,
+                            'security_score', t.security_score,
+                            'analyzed_at', t.analyzed_at,
+                            'last_analyzed_at', t.last_analyzed_at,
+                            'mentor_name', COALESCE(u.full_name, u.email),
+                            'batches', CASE WHEN b.id IS NOT NULL THEN jsonb_build_object(
+                                'id', b.id,
+                                'name', b.name,
+                                'semester', b.semester,
+                                'year', b.year
+                            ) END,
+                            'student_count', (
+                                SELECT count(*) FROM students s WHERE s.team_id = t.id
+                            )
+                        ) AS team,
+                        row_number() OVER (ORDER BY %2$s) AS position
+                    FROM teams t
+                    LEFT JOIN users u ON u.id = t.mentor_id
+                    LEFT JOIN batches b ON b.id = t.batch_id
+                    WHERE %1$s AND %3$s
+                    ORDER BY %2$s
+                    LIMIT $6 OFFSET $7
+                ) page
+            ), '[]'::jsonb)
+        )
+    $query$, v_filters, v_order, v_keyset)
+    INTO v_result
+    USING p_batch_id, p_mentor_id, p_assigned_to, p_status, p_search, p_limit, p_offset,
+          p_after_name, p_after_id;
+
+    RETURN v_result;
+END;
+$$;
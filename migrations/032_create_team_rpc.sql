@@ -0,0 +1,63 @@
+-- Migration: Create a team, its students and its analysis job in one call
+-- Date: 2026-10-16
+-- Description: create_team inserted the team, then the students and the
+-- queued analysis job as separate requests. A failure between them left a
+-- team marked queued with no job, or a team without its students.
+-- create_team_with_students does the three inserts in one transaction and
+-- returns the team (with its batch embedded), the inserted students and the
+-- job id, so the endpoint only has to hand the job to Celery.
+
+CREATE OR REPLACE FUNCTION create_team_with_students(
+    p_batch_id UUID,
+    p_team_name TEXT,
+    p_repo_url TEXT DEFAULT NULL,
+    p_students JSONB DEFAULT '[]'::jsonb
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_team_id UUID := gen_random_uuid();
+    v_queue BOOLEAN := NULLIF(p_repo_url, '') IS NOT NULL;
+    v_job_id UUID;
+    v_students JSONB;
+    v_team JSONB;
+BEGIN
+    -- A team with a repo URL is queued for analysis right away
+    INSERT INTO teams (id, batch_id, team_name, repo_url, health_status, status, student_count)
+    VALUES (
+        v_team_id, p_batch_id, p_team_name, p_repo_url, 'on_track',
+        CASE WHEN v_queue THEN 'queued' ELSE 'pending' END,
+        jsonb_array_length(p_students)
+    );
+
+    WITH inserted AS (
+        INSERT INTO students (team_id, name, email, github_username)
+        SELECT v_team_id, s.name, s.email, s.github_username
+        FROM jsonb_to_recordset(p_students) AS s(name TEXT, email TEXT, github_username TEXT)
+        RETURNING *
+    )
+    SELECT COALESCE(jsonb_agg(to_jsonb(inserted)), '[]'::jsonb)
+    INTO v_students
+    FROM inserted;
+
+    IF v_queue THEN
+        INSERT INTO analysis_jobs (id, team_id, status, progress, started_at)
+        VALUES (gen_random_uuid(), v_team_id, 'queued', 0, NOW())
+        RETURNING id INTO v_job_id;
+    END IF;
+
+    SELECT to_jsonb(t) || jsonb_build_object(
+        'batches', (
+            SELECT jsonb_build_object('id', b.id, 'name', b.name, 'semester', b.semester, 'year', b.year)
+            FROM batches b
+            WHERE b.id = t.batch_id
+        )
+    )
+    INTO v_team
+    FROM teams t
+    WHERE t.id = v_team_id;
+
+    RETURN jsonb_build_object('team', v_team, 'students', v_students, 'job_id', v_job_id);
+END;
+$$;
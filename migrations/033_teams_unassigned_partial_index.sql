@@ -0,0 +1,14 @@
+-- Migration: Partial index for unassigned teams
+-- Date: 2026-10-16
+-- Description: The admin "unassigned" tab calls list_teams_page with
+-- status = 'unassigned', which filters on mentor_id IS NULL. Most teams have
+-- a mentor, so a full index on mentor_id is mostly dead weight for this
+-- query. The partial index holds only the unassigned teams, keyed like
+-- idx_teams_batch_name_key (028). A batch's unassigned page is then read in
+-- the natural name order straight from a small index. The EXECUTE in
+-- list_teams_page plans with the actual parameter values, so the CASE
+-- around the filter folds away and the index predicate matches.
+
+CREATE INDEX IF NOT EXISTS idx_teams_unassigned
+    ON teams(batch_id, team_name_sort_key(team_name), team_name, id)
+    WHERE mentor_id IS NULL;
@@ -0,0 +1,30 @@
+-- Migration: Replace the team members of imported teams in one call
+-- Date: 2026-10-16
+-- Description: The bulk import cleared team_members with one DELETE per 200
+-- team ids, each id inlined in the URL, and then re-inserted the rows in
+-- chunks. That took several round-trips with no transaction around them, so a
+-- failed insert left teams without any members. replace_team_members takes
+-- the team ids as one uuid[] and the rows as one JSONB array. It deletes and
+-- inserts in a single transaction and returns the number of inserted rows.
+
+CREATE OR REPLACE FUNCTION replace_team_members(
+    p_team_ids UUID[],
+    p_members JSONB DEFAULT '[]'::jsonb
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_inserted INTEGER;
+BEGIN
+    DELETE FROM team_members WHERE team_id = ANY(p_team_ids);
+
+    INSERT INTO team_members (team_id, name, commits, contribution_pct)
+    SELECT m.team_id, m.name, COALESCE(m.commits, 0), COALESCE(m.contribution_pct, 0)
+    FROM jsonb_to_recordset(p_members)
+        AS m(team_id UUID, name TEXT, commits INTEGER, contribution_pct FLOAT);
+    GET DIAGNOSTICS v_inserted = ROW_COUNT;
+
+    RETURN v_inserted;
+END;
+$$;
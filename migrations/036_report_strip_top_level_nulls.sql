@@ -0,0 +1,104 @@
+-- Migration: Strip only top-level nulls from trimmed analysis_result
+-- Date: 2026-10-16
+-- Description: jsonb_strip_nulls is recursive. Trimming analysis_result
+-- with it also dropped null keys inside the kept values, so clients read
+-- undefined where the stored result had null. jsonb_strip_top_level_nulls
+-- removes only the object's own null keys, which is what lets the
+-- endpoint's defaults apply to missing scores. get_batch_report_data is
+-- redefined to use it; nothing else changes.
+
+CREATE OR REPLACE FUNCTION jsonb_strip_top_level_nulls(p_value JSONB)
+RETURNS JSONB
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT COALESCE(jsonb_object_agg(e.key, e.value), '{}'::jsonb)
+    FROM jsonb_each(p_value) AS e(key, value)
+    WHERE jsonb_typeof(e.value) <> 'null';
+$$;
+
+CREATE OR REPLACE FUNCTION get_batch_report_data(
+    p_batch_id UUID,
+    p_known_updated_at TIMESTAMPTZ DEFAULT NULL,
+    p_include_students BOOLEAN DEFAULT FALSE
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'batch', jsonb_build_object(
+            'id', b.id,
+            'name', b.name,
+            'updated_at', b.updated_at
+        ),
+        'teams', CASE WHEN v.fresh THEN NULL ELSE COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'id', t.id,
+                'team_name', t.team_name,
+                'mentor_id', t.mentor_id,
+                'health_status', t.health_status,
+                'last_analyzed_at', t.last_analyzed_at,
+                'analysis_result', CASE WHEN jsonb_typeof(t.analysis_result) = 'object' THEN jsonb_strip_top_level_nulls(jsonb_build_object(
+                    'totalScore', t.analysis_result->'totalScore',
+                    'qualityScore', t.analysis_result->'qualityScore',
+                    'securityScore', t.analysis_result->'securityScore',
+                    'originalityScore', t.analysis_result->'originalityScore',
+                    'architectureScore', t.analysis_result->'architectureScore',
+                    'documentationScore', t.analysis_result->'documentationScore',
+                    'frameworks', t.analysis_result->'frameworks'
+                )) END,
+                'students', CASE WHEN p_include_students THEN COALESCE(ts.students, '[]'::jsonb) END
+            ) ORDER BY t.analysis_total_score DESC NULLS LAST)
+            FROM teams t
+            LEFT JOIN (
+                SELECT s.team_id, jsonb_agg(jsonb_build_object(
+                    'name', s.name,
+                    'email', s.email,
+                    'admin_grade', s.admin_grade,
+                    'admin_feedback', s.admin_feedback,
+                    'grading_details', s.grading_details
+                )) AS students
+                FROM students s
+                JOIN teams st ON st.id = s.team_id
+                WHERE p_include_students AND st.batch_id = p_batch_id
+                GROUP BY s.team_id
+            ) ts ON ts.team_id = t.id
+            WHERE t.batch_id = b.id
+        ), '[]'::jsonb) END,
+        'aggregates', CASE WHEN v.fresh THEN NULL ELSE (
+            SELECT jsonb_build_object(
+                'averageScore', COALESCE(avg(a.total_score) FILTER (WHERE a.total_score > 0), 0),
+                'averageAiUsage', COALESCE(avg(a.ai_percentage) FILTER (WHERE a.ai_percentage > 0), 0),
+                'totalSecurityIssues', COALESCE(sum(a.security_issues), 0),
+                'mostUsedTech', (
+                    SELECT f.tech
+                    FROM teams t
+                    CROSS JOIN LATERAL jsonb_array_elements_text(
+                        CASE WHEN jsonb_typeof(t.analysis_result->'frameworks') = 'array'
+                            THEN t.analysis_result->'frameworks' ELSE '[]'::jsonb END
+                    ) AS f(tech)
+                    WHERE t.batch_id = b.id AND f.tech IS NOT NULL
+                    GROUP BY f.tech
+                    ORDER BY count(*) DESC, max(t.analysis_total_score) DESC NULLS LAST, f.tech
+                    LIMIT 1
+                )
+            )
+            FROM (
+                SELECT
+                    t.analysis_total_score AS total_score,
+                    CASE WHEN jsonb_typeof(t.analysis_result->'aiGeneratedPercentage') = 'number'
+                        THEN (t.analysis_result->>'aiGeneratedPercentage')::numeric END AS ai_percentage,
+                    CASE WHEN jsonb_typeof(t.analysis_result->'securityIssues') = 'array'
+                        THEN jsonb_array_length(t.analysis_result->'securityIssues') ELSE 0 END AS security_issues
+                FROM teams t
+                WHERE t.batch_id = b.id
+            ) a
+        ) END
+    )
+    FROM batches b
+    CROSS JOIN LATERAL (
+        SELECT p_known_updated_at IS NOT NULL AND p_known_updated_at = b.updated_at AS fresh
+    ) v
+    WHERE b.id = p_batch_id;
+$$;
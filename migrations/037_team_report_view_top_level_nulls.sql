@@ -0,0 +1,44 @@
+-- Migration: Strip only top-level nulls in team_report_view
+-- Date: 2026-10-16
+-- Description: The view trimmed analysis_result with jsonb_strip_nulls,
+-- which also removed null keys inside securityIssues entries and
+-- commitForensics contributors. team_report_view now uses
+-- jsonb_strip_top_level_nulls (036), so only the trimmed object's own null
+-- keys, and those of its commitForensics summary, are left out.
+
+CREATE OR REPLACE VIEW team_report_view
+WITH (security_invoker = true)
+AS
+SELECT
+    t.id,
+    t.team_name,
+    t.batch_id,
+    t.mentor_id,
+    t.health_status,
+    t.risk_flags,
+    t.last_analyzed_at,
+    t.updated_at,
+    CASE WHEN jsonb_typeof(t.analysis_result) = 'object' THEN jsonb_strip_top_level_nulls(jsonb_build_object(
+        'totalScore', t.analysis_result->'totalScore',
+        'qualityScore', t.analysis_result->'qualityScore',
+        'securityScore', t.analysis_result->'securityScore',
+        'originalityScore', t.analysis_result->'originalityScore',
+        'architectureScore', t.analysis_result->'architectureScore',
+        'documentationScore', t.analysis_result->'documentationScore',
+        'commitForensics', NULLIF(jsonb_strip_top_level_nulls(jsonb_build_object(
+            'totalCommits', t.analysis_result->'commitForensics'->'totalCommits',
+            'contributors', t.analysis_result->'commitForensics'->'contributors'
+        )), '{}'::jsonb),
+        'totalFiles', t.analysis_result->'totalFiles',
+        'totalLinesOfCode', t.analysis_result->'totalLinesOfCode',
+        'languages', t.analysis_result->'languages',
+        'frameworks', t.analysis_result->'frameworks',
+        'architecturePattern', t.analysis_result->'architecturePattern',
+        'securityIssues', t.analysis_result->'securityIssues',
+        'secretsDetected', t.analysis_result->'secretsDetected',
+        'aiGeneratedPercentage', t.analysis_result->'aiGeneratedPercentage',
+        'aiVerdict', t.analysis_result->'aiVerdict',
+        'strengths', t.analysis_result->'strengths',
+        'improvements', t.analysis_result->'improvements'
+    )) END AS analysis_result
+FROM teams t;
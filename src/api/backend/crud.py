@@ -667,21 +667,25 @@ class TeamCRUD:
         return result.data or []
 
     @staticmethod
-    def get_mentor_team_ids(mentor_id: str) -> List[str]:
+    def get_mentor_team_ids(mentor_id: str, strict: bool = False) -> List[str]:
         """
         Get all team IDs assigned to a mentor using hybrid strategy.
         Checks both 'teams.mentor_id' (legacy) and 'mentor_team_assignments' (new).
+        A failed lookup is skipped (or raised when strict) and the result is
+        not cached, so a transient error is not remembered as "no teams".
         """
         from src.api.backend.utils.cache import cache, RedisCache
 
         cache_key = f"hackeval:mentor:team_ids:{mentor_id}"
         cached_ids = cache.get(cache_key)
-        if cached_ids:
+        # An empty list is a valid cached answer (mentor with no teams)
+        if cached_ids is not None:
             print(f"[TeamCRUD] Returning cached team IDs for mentor {mentor_id}: {cached_ids}")
             return cached_ids
 
         supabase = get_supabase_client()
         team_ids = set()
+        lookup_failed = False
         
         # A. Check 'teams' table direct column
         try:
@@ -692,6 +696,9 @@ class TeamCRUD:
                 print(f"[TeamCRUD] Found {len(direct_ids)} teams via teams.mentor_id for mentor {mentor_id}")
         except Exception as e:
             print(f"[TeamCRUD] Warning fetching direct mentor teams: {e}")
+            if strict:
+                raise
+            lookup_failed = True
 
         # B. Check 'mentor_team_assignments' junction table
         try:
@@ -702,10 +709,14 @@ class TeamCRUD:
                 print(f"[TeamCRUD] Found {len(assignment_ids)} teams via mentor_team_assignments for mentor {mentor_id}")
         except Exception as e:
             print(f"[TeamCRUD] Warning fetching mentor assignments: {e}")
+            if strict:
+                raise
+            lookup_failed = True
             
         team_id_list = list(team_ids)
         print(f"[TeamCRUD] Total unique team IDs for mentor {mentor_id}: {len(team_id_list)}")
-        cache.set(cache_key, team_id_list, RedisCache.TTL_SHORT)
+        if not lookup_failed:
+            cache.set(cache_key, team_id_list, RedisCache.TTL_SHORT)
         return team_id_list
 
     @staticmethod
@@ -2,7 +2,8 @@
 Supabase Database Connection and Utilities
 """
 import os
-from supabase import create_client, Client
+import httpx
+from supabase import create_client, Client, ClientOptions
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,9 +13,43 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
+# HTTP pool settings shared by every Supabase client in this process
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "50"))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "20"))
+SUPABASE_HTTP_TIMEOUT = 120  # matches supabase-py's default PostgREST timeout
+
 # Singleton client
 _supabase_client: Client = None
 _supabase_admin_client: Client = None
+_http_client: httpx.Client = None
+
+
+def _get_http_client() -> httpx.Client:
+    """
+    Get the shared keep-alive HTTP client used by the Supabase clients.
+    Left to themselves, the anon and admin clients (and each of their
+    PostgREST/Auth/Storage sub-clients) build separate httpx pools; sharing
+    one bounded HTTP/2 pool keeps TLS connections warm across requests.
+    """
+    global _http_client
+    
+    if _http_client is None:
+        _http_client = httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            timeout=SUPABASE_HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=SUPABASE_MAX_CONNECTIONS,
+                max_keepalive_connections=SUPABASE_MAX_KEEPALIVE
+            )
+        )
+    
+    return _http_client
+
+
+def _create_client(key: str) -> Client:
+    """Create a Supabase client bound to the shared HTTP pool"""
+    return create_client(SUPABASE_URL, key, options=ClientOptions(httpx_client=_get_http_client()))
 
 
 def get_supabase_client() -> Client:
@@ -25,7 +60,7 @@ def get_supabase_client() -> Client:
         raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment")
     
     if _supabase_client is None:
-        _supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        _supabase_client = _create_client(SUPABASE_KEY)
     
     return _supabase_client
 
@@ -38,7 +73,7 @@ def get_supabase_admin_client() -> Client:
         raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set in environment")
     
     if _supabase_admin_client is None:
-        _supabase_admin_client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+        _supabase_admin_client = _create_client(SUPABASE_SERVICE_KEY)
     
     return _supabase_admin_client
 
@@ -20,11 +20,14 @@ security = HTTPBearer()
 
 class AuthUser:
     """Authenticated user context"""
-    def __init__(self, user_id: UUID, email: str, role: str, full_name: Optional[str] = None):
+    def __init__(self, user_id: UUID, email: str, role: str, full_name: Optional[str] = None,
+                 mentor_flag: bool = False):
         self.user_id = user_id
         self.email = email
         self.role = role
         self.full_name = full_name
+        # users.is_mentor: set for admins who also mentor teams
+        self.mentor_flag = mentor_flag
     
     def is_admin(self) -> bool:
         """Check if user is admin"""
@@ -117,14 +120,16 @@ async def get_current_user(
         # IMPORTANT: Fetch FRESH role from users table first (where admin panel updates it)
         # Fall back to app_metadata only if users table lookup fails
         role = "none"  # Default fallback for revoked users
+        mentor_flag = False
         try:
             admin_client = get_supabase_admin_client()
 
             # First, check the users table (where role is updated by admin panel)
-            users_result = admin_client.table("users").select("role").eq("id", user_id).execute()
+            users_result = admin_client.table("users").select("role, is_mentor").eq("id", user_id).execute()
             if users_result.data and len(users_result.data) > 0:
                 db_role = users_result.data[0].get("role")
                 role = db_role if db_role else "none"
+                mentor_flag = bool(users_result.data[0].get("is_mentor"))
                 print(f"[Auth] Role from users table: {role}")
             else:
                 admin_user = admin_client.auth.admin.get_user_by_id(user_id)
@@ -150,7 +155,8 @@ async def get_current_user(
             user_id=UUID(user.id),
             email=user.email,
             role=role,
-            full_name=full_name
+            full_name=full_name,
+            mentor_flag=mentor_flag
         )
         
     except HTTPException:
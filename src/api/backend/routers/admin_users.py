@@ -9,6 +9,7 @@ from pydantic import BaseModel
 
 from ..middleware.auth import get_current_user, AuthUser
 from ..database import get_supabase_admin_client
+from ..utils.cache import cache
 
 router = APIRouter(prefix="/api/admin", tags=["admin-users"])
 
@@ -140,6 +141,7 @@ async def update_user_role(
             raise HTTPException(status_code=404, detail="User not found")
         
         updated_user = response.data[0]
+        cache.delete("hackeval:mentors:import_map")
 
         # Sync role/is_mentor into Supabase Auth app_metadata
         try:
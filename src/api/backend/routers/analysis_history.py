@@ -9,6 +9,7 @@ from uuid import uuid4
 
 from ..middleware.auth import get_current_user, AuthUser, RoleChecker
 from ..database import get_supabase_admin_client
+from ..utils.cache import cache
 
 router = APIRouter(prefix="/api/analysis/history", tags=["analysis-history"])
 
@@ -248,6 +249,7 @@ async def create_analysis_snapshot(
         snapshot_data,
         on_conflict="team_id,run_number"
     ).execute()
+    cache.incr(f"hackeval:rev:progress:{team_id}")
     
     return {
         "snapshotId": snapshot_data["id"],
@@ -273,4 +275,6 @@ async def delete_snapshot(
     if not result.data:
         raise HTTPException(status_code=404, detail="Snapshot not found")
     
+    cache.incr(f"hackeval:rev:progress:{result.data[0]['team_id']}")
+    
     return {"message": "Snapshot deleted successfully"}
@@ -7,7 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Path
 import re
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta, timezone
-import json
+import orjson
 import httpx
 import os
 
@@ -25,6 +25,23 @@ from ..utils.health import calculate_team_health, get_risk_flag_display
 router = APIRouter(prefix="/api/teams", tags=["analytics"])
 
 
+def _report_data(team: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the team's analysis report: report_json when present, otherwise
+    analysis_result. Either may come back as JSON text; anything missing or
+    undecodable yields {}.
+    """
+    for report in (team.get("report_json"), team.get("analysis_result")):
+        if isinstance(report, str):
+            try:
+                report = orjson.loads(report)
+            except orjson.JSONDecodeError:
+                report = None
+        if report and isinstance(report, dict):
+            return report
+    return {}
+
+
 def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
     if not value:
         return None
@@ -278,23 +295,7 @@ async def get_team_analytics(
     
     # Use team data directly (analysis results are now in teams table)
     project = team
-    
-    report_json = project.get("report_json") or {}
-    if isinstance(report_json, str):
-        try:
-            report_json = json.loads(report_json)
-        except Exception:
-            report_json = {}
-
-    analysis_result = project.get("analysis_result") or {}
-    if not report_json and analysis_result:
-        if isinstance(analysis_result, str):
-            try:
-                report_json = json.loads(analysis_result)
-            except Exception:
-                report_json = {}
-        elif isinstance(analysis_result, dict):
-            report_json = analysis_result
+    report_json = _report_data(team)
 
     scores = FrontendAdapter._extract_scores(project, report_json)
 
@@ -675,19 +676,9 @@ async def get_team_commits(
             "pageSize": pageSize
         }
     
-    # Use team data directly (analysis results are now in teams table)
-    project = team
-    
-    # Try to get report data from report_json (preferred) or analysis_result
-    report = project.get("report_json")
-    if not report:
-        report = project.get("analysis_result")
-        
-    if isinstance(report, str):
-        try:
-            report = json.loads(report)
-        except:
-            report = {}
+    # Report data from report_json (preferred) or analysis_result
+    # (analysis results are now in teams table)
+    report = _report_data(team)
             
     if not report:
          return {
@@ -785,14 +776,7 @@ async def get_team_file_tree(
         }
     
     # Use team data directly (analysis results are now in teams table)
-    project = team
-    report = project.get("report_json") or project.get("analysis_result") or {}
-
-    if isinstance(report, str):
-        try:
-            report = json.loads(report)
-        except:
-            report = {}
+    report = _report_data(team)
 
     structure = report.get("structure", {}) if isinstance(report.get("structure"), dict) else {}
 
@@ -102,12 +102,10 @@ async def assign_teams(
         f"hackeval:mentor:dashboard:{mentor_id_str}",
         f"hackeval:mentor:reports:{mentor_id_str}:all"
     ]
-    for key in cache_keys_to_clear:
-        try:
-            cache.delete(key)
-            print(f"[Assignments] Cleared cache key: {key}")
-        except Exception as e:
-            print(f"[Assignments] Failed to clear cache key {key}: {e}")
+    cleared = cache.delete_many(*cache_keys_to_clear)
+    # Invalidates the mentor's reports for every batch filter
+    cache.incr(f"hackeval:rev:mentor:{mentor_id_str}")
+    print(f"[Assignments] Cleared {cleared} cache keys for mentor {mentor_id_str}")
     
     return AssignmentResponse(
         success=True,
@@ -158,12 +156,10 @@ async def unassign_teams(
         f"hackeval:mentor:dashboard:{mentor_id_str}",
         f"hackeval:mentor:reports:{mentor_id_str}:all"
     ]
-    for key in cache_keys_to_clear:
-        try:
-            cache.delete(key)
-            print(f"[Assignments] Cleared cache key: {key}")
-        except Exception as e:
-            print(f"[Assignments] Failed to clear cache key {key}: {e}")
+    cleared = cache.delete_many(*cache_keys_to_clear)
+    # Invalidates the mentor's reports for every batch filter
+    cache.incr(f"hackeval:rev:mentor:{mentor_id_str}")
+    print(f"[Assignments] Cleared {cleared} cache keys for mentor {mentor_id_str}")
     
     return MessageResponse(
         success=True,
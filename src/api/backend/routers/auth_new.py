@@ -240,12 +240,8 @@ async def get_current_user_profile(current_user: AuthUser = Depends(get_current_
     print(f"[Auth] Final role for {current_user.email}: {role}")
     
     # Check if user has mentor access (app_metadata.is_mentor OR users.is_mentor OR mentors table)
-    is_mentor = bool(fresh_metadata.get("is_mentor"))
+    is_mentor = bool(fresh_metadata.get("is_mentor")) or current_user.mentor_flag
     try:
-        if not is_mentor:
-            mentor_flag = admin_client.table("users").select("is_mentor").eq("id", user_id).limit(1).execute()
-            if mentor_flag.data:
-                is_mentor = bool(mentor_flag.data[0].get("is_mentor"))
         if not is_mentor:
             mentor_result = admin_client.table("mentors").select("id").eq("user_id", user_id).limit(1).execute()
             is_mentor = bool(mentor_result.data)
@@ -17,6 +17,7 @@ from ..schemas import (
 )
 from ..middleware import get_current_user, AuthUser, RoleChecker
 from ..database import get_supabase_admin_client
+from ..utils.cache import cache
 
 router = APIRouter(prefix="/api/batches", tags=["Batch Management"])
 
@@ -1187,6 +1188,9 @@ async def delete_batch(
                 detail="Batch not found"
             )
         
+        # Team writes re-check the batch from now on
+        cache.delete(f"hackeval:batch:exists:{batch_id}")
+        
         # Get all teams in this batch
         teams_response = supabase.table("teams").select("id").eq("batch_id", str(batch_id)).execute()
         teams_data = teams_response.data or []
@@ -1229,25 +1233,8 @@ async def delete_batch(
                     print(f"Failed to revoke batch task {celery_task_id}: {e}")
 
         if team_ids:
-            # Delete all related data for these teams
-            # Order matters: delete child records before parent records
-            
-            # 1. Delete analysis-related data
-            supabase.table("analysis_jobs").delete().in_("team_id", team_ids).execute()
-            supabase.table("analysis_snapshots").delete().in_("team_id", team_ids).execute()
-            
-            # 2. Delete team-related data
-            supabase.table("issues").delete().in_("team_id", team_ids).execute()
-            supabase.table("project_comments").delete().in_("team_id", team_ids).execute()
-            supabase.table("tech_stack").delete().in_("team_id", team_ids).execute()
-            supabase.table("team_members").delete().in_("team_id", team_ids).execute()
-            
-            # 3. Delete assignments
-            supabase.table("mentor_team_assignments").delete().in_("team_id", team_ids).execute()
-            supabase.table("students").delete().in_("team_id", team_ids).execute()
-            
-            # 4. Delete teams themselves
-            supabase.table("teams").delete().in_("id", team_ids).execute()
+            # Child rows and the teams go in one transaction (migration 030)
+            supabase.rpc("delete_teams_cascade", {"p_team_ids": team_ids}).execute()
         
         # Delete batch analysis runs
         supabase.table("batch_analysis_runs").delete().eq("batch_id", str(batch_id)).execute()
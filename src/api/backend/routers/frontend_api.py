@@ -5,6 +5,7 @@ Matches the expected frontend specification
 from fastapi import APIRouter, HTTPException, Query, BackgroundTasks, UploadFile, File, Form
 from typing import Optional, List
 from uuid import UUID
+from collections import Counter
 import csv
 import io
 
@@ -267,19 +268,17 @@ async def get_available_technologies():
         teams_result = supabase.table("teams").select("id").execute()
         teams = teams_result.data or []
         
-        tech_count = {}
+        tech_count = Counter()
         if teams:
             team_ids = [t["id"] for t in teams]
             tech_result = supabase.table("tech_stack").select("technology").in_("team_id", team_ids).execute()
-            for tech in (tech_result.data or []):
-                name = tech.get("technology")
-                if name:
-                    tech_count[name] = tech_count.get(name, 0) + 1
+            tech_count.update(
+                name for name in (tech.get("technology") for tech in (tech_result.data or [])) if name
+            )
         
-        # Convert to list and sort by usage
+        # Convert to list sorted by usage
         tech_list = [{"name": name, "count": count} 
-                     for name, count in tech_count.items()]
-        tech_list = sorted(tech_list, key=lambda x: x["count"], reverse=True)
+                     for name, count in tech_count.most_common()]
         
         # Cache for 5 minutes
         cache.set(cache_key, tech_list, RedisCache.TTL_MEDIUM)
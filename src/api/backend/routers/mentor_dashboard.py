@@ -18,7 +18,6 @@ from ..schemas import (
     LeaderboardItem,
     MentorReportResponse
 )
-from uuid import UUID
 
 
 router = APIRouter(prefix="/api/mentor", tags=["Mentor Dashboard"])
@@ -27,15 +26,9 @@ router = APIRouter(prefix="/api/mentor", tags=["Mentor Dashboard"])
 def require_mentor(current_user: AuthUser = Depends(get_current_user)) -> AuthUser:
     """Dependency to ensure user is a mentor."""
     if current_user.role.lower() != "mentor":
-        # Allow admin users with is_mentor flag
-        if current_user.role.lower() == "admin":
-            try:
-                admin_supabase = get_supabase_admin_client()
-                mentor_flag = admin_supabase.table("users").select("is_mentor").eq("id", str(current_user.user_id)).limit(1).execute()
-                if mentor_flag.data and mentor_flag.data[0].get("is_mentor"):
-                    return current_user
-            except Exception as e:
-                print(f"[Mentor Dashboard] Mentor flag lookup failed: {e}")
+        # Allow admin users with is_mentor flag (loaded with the user)
+        if current_user.role.lower() == "admin" and current_user.mentor_flag:
+            return current_user
         raise HTTPException(status_code=403, detail="Mentor access required")
     return current_user
 
@@ -186,7 +179,7 @@ async def get_mentor_leaderboard(
     for idx, team in enumerate(result.data):
         leaderboard_items.append(LeaderboardItem(
             rank=start + idx + 1,
-            id=UUID(team["id"]),
+            id=team["id"],
             repo_url=team["repo_url"],
             team_name=team.get("team_name"),
             total_score=team.get("total_score", 0),
@@ -418,13 +411,9 @@ async def clear_mentor_cache(
         f"hackeval:mentor:team_ids:{mentor_id}",
     ]
     
-    cleared_count = 0
-    for key in cache_keys:
-        try:
-            cache.delete(key)
-            cleared_count += 1
-        except Exception as e:
-            print(f"[Mentor Dashboard] Failed to clear cache key {key}: {e}")
+    cleared_count = cache.delete_many(*cache_keys)
+    # Invalidates the mentor's reports for every batch filter
+    cache.incr(f"hackeval:rev:mentor:{mentor_id}")
     
     print(f"[Mentor Dashboard] Cleared {cleared_count} cache entries for mentor {mentor_id}")
     
@@ -15,6 +15,7 @@ from ..schemas import (
 )
 from ..middleware import get_current_user, RoleChecker, AuthUser
 from ..database import get_supabase, get_supabase_admin_client
+from ..utils.cache import cache
 
 router = APIRouter(prefix="/api/mentors", tags=["Mentors"])
 
@@ -138,6 +139,8 @@ async def create_mentor(
         insert_response = supabase.table("users").insert(user_insert).execute()
         mentor_record = (insert_response.data or [user_insert])[0]
 
+    cache.delete("hackeval:mentors:import_map")
+
     return MentorResponse(
         mentor={
             "id": mentor_record.get("id"),
@@ -266,6 +269,8 @@ async def update_mentor(
     if not mentor_response.data:
         raise HTTPException(status_code=500, detail="Failed to update mentor")
     
+    cache.delete("hackeval:mentors:import_map")
+    
     # Get updated mentor with team count
     updated_mentor = mentor_response.data[0]
     
@@ -310,6 +315,14 @@ async def delete_mentor(
     
     # Delete user account
     supabase.table("users").delete().eq("id", str(mentor_id)).execute()
+    cache.delete("hackeval:mentors:import_map")
+    cache.delete_many(
+        f"hackeval:mentor:team_ids:{mentor_id}",
+        f"hackeval:mentor:dashboard:{mentor_id}",
+        f"hackeval:mentor:reports:{mentor_id}:all",
+    )
+    # Invalidates the mentor's reports for every batch filter
+    cache.incr(f"hackeval:rev:mentor:{mentor_id}")
     
     return MessageResponse(
         success=True,
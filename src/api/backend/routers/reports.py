@@ -3,173 +3,429 @@ Reports API endpoints.
 Generates comprehensive reports for batches, mentors, and teams.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from typing import Iterator, Optional
+from pydantic import TypeAdapter
 from datetime import datetime
-import json
+from collections import Counter
+import asyncio
+import csv
+import logging
+import orjson
 
 from ..middleware.auth import get_current_user
 from ..database import get_supabase
 from ..schemas import (
     BatchReportResponse,
+    BatchReportInsights,
+    BatchReportSummary,
+    BatchReportTeam,
     MentorReportResponse,
     TeamReportResponse
 )
 from ..utils.cache import cache, RedisCache
+from ..utils.http_cache import weak_etag, check_not_modified
 
-router = APIRouter(prefix="/api/reports", tags=["reports"])
+router = APIRouter(prefix="/api/reports", tags=["reports"], default_response_class=ORJSONResponse)
+logger = logging.getLogger(__name__)
 
+# Browsers may reuse a rendered report briefly; it is user-specific, so private
+REPORT_CACHE_CONTROL = "private, max-age=30"
 
-@router.get("/batch/{batchId}", response_model=BatchReportResponse)
-async def get_batch_report(
-    batchId: str = Path(..., description="Batch ID"),
-    format: Optional[str] = Query("json", description="Format: json, pdf, or csv"),
-    current_user: dict = Depends(get_current_user)
-):
+# Column projections - only what the report builders read, so PostgREST does
+# not serialize (and we do not decode) unused team columns
+# The mentor report reads three scores, so they are pulled out of
+# analysis_result with JSON arrows instead of shipping the whole document
+MENTOR_REPORT_TEAM_COLUMNS = (
+    "id, team_name, batch_id, health_status, last_analyzed_at, "
+    "total_score:analysis_result->totalScore, "
+    "quality_score:analysis_result->qualityScore, "
+    "security_score:analysis_result->securityScore"
+)
+TEAM_REPORT_COLUMNS = (
+    "id, team_name, batch_id, mentor_id, health_status, risk_flags, "
+    "last_analyzed_at, updated_at, analysis_result"
+)
+
+
+# Batch CSV export columns; one line per student, or one per team without students
+BATCH_CSV_FIELDS = [
+    "Rank", "Team Name", "Student Name", "Student Email", 
+    "Admin Grade", "Admin Feedback", 
+    "Mentor Grade", "Mentor Feedback",
+    "Total Score", "Quality", "Security", "Originality", "Architecture", 
+    "Documentation", "Health Status", "Verdict", "Mentor", "Frameworks"
+]
+
+# Student columns of a team's CSV line when the team has no students
+_NO_STUDENT_COLUMNS = ("N/A",) * 6
+
+
+# Validators/serializers are built once at import; each response is then
+# validated and encoded by pydantic-core without FastAPI's per-call
+# response_model handling (response_model stays on the routes for OpenAPI)
+_BATCH_REPORT_ADAPTER = TypeAdapter(BatchReportResponse)
+_BATCH_SUMMARY_ADAPTER = TypeAdapter(BatchReportSummary)
+_BATCH_TEAM_ADAPTER = TypeAdapter(BatchReportTeam)
+_BATCH_INSIGHTS_ADAPTER = TypeAdapter(BatchReportInsights)
+_MENTOR_REPORT_ADAPTER = TypeAdapter(MentorReportResponse)
+_TEAM_REPORT_ADAPTER = TypeAdapter(TeamReportResponse)
+
+
+def _dump(adapter: TypeAdapter, data: dict) -> bytes:
+    """Validate data against a precompiled adapter and encode it to JSON."""
+    return adapter.dump_json(adapter.validate_python(data))
+
+
+def _json_response(adapter: TypeAdapter, report: dict, headers: Optional[dict] = None) -> Response:
+    """Return a report rendered through its precompiled adapter."""
+    return _body_response(_dump(adapter, report), headers)
+
+
+def _body_response(body, headers: Optional[dict] = None) -> Response:
     """
-    Generate batch-wide report.
-    Admin only.
+    Return an already encoded JSON report. Reports are cached as their
+    encoded body, so cache hits skip validation and serialization entirely.
     """
-    # Check admin role
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    # Check cache first (skip for CSV/PDF exports)
-    if format == "json":
-        cache_key = f"hackeval:report:batch:{batchId}"
-        cached_result = cache.get(cache_key)
-        if cached_result:
-            return cached_result
-    
-    supabase = get_supabase()
-    
-    # Verify batch exists
-    batch_response = supabase.table("batches").select("*").eq("id", batchId).execute()
-    if not batch_response.data:
-        raise HTTPException(status_code=404, detail="Batch not found")
-    
-    batch = batch_response.data[0]
-    
-    # Get all teams in the batch with students (single query)
-    # Projects table has been dropped - all analysis data is now in teams table
-    teams_response = supabase.table("teams").select(
-        "*, students(*)"
-    ).eq("batch_id", batchId).execute()
-    
-    teams = teams_response.data or []
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Score columns of a batch report row for a team that has not been analyzed
+_ZERO_BATCH_SCORES = {
+    "totalScore": 0,
+    "qualityScore": 0,
+    "securityScore": 0,
+    "originalityScore": 0,
+    "architectureScore": 0,
+    "documentationScore": 0
+}
+
+# Fallbacks for the analysis_result keys read by the team report, merged
+# under the stored result once instead of a .get default per field
+_TEAM_DEFAULTS = {
+    **_ZERO_BATCH_SCORES,
+    "commitForensics": {},
+    "totalFiles": 0,
+    "totalLinesOfCode": 0,
+    "languages": [],
+    "frameworks": [],
+    "architecturePattern": "Unknown",
+    "securityIssues": [],
+    "secretsDetected": 0,
+    "aiGeneratedPercentage": 0,
+    "aiVerdict": "Unknown",
+    "strengths": [],
+    "improvements": []
+}
+
+
+def _analysis(team: dict) -> dict:
+    """Return the team's analysis_result as a dict.
+
+    The column is JSONB (migration 018), so PostgREST already hands back a
+    decoded object. Rows cached before the migration may still carry a
+    JSON string; those are decoded here and nowhere else, and the decoded
+    dict is written back onto the row so a second lookup does not parse it
+    again. Anything that is not an object (JSONB also admits arrays and
+    scalars) becomes ``{}`` so callers can use ``.get`` without further
+    type checks.
+    """
+    analysis_result = team.get("analysis_result")
+    if isinstance(analysis_result, dict):
+        return analysis_result
+    if isinstance(analysis_result, str):
+        try:
+            analysis_result = orjson.loads(analysis_result)
+        except orjson.JSONDecodeError:
+            analysis_result = None
+        if not isinstance(analysis_result, dict):
+            analysis_result = {}
+        team["analysis_result"] = analysis_result
+        return analysis_result
+    return {}
+
+
+def _batch_team_row(rank: int, team: dict) -> dict:
+    """Build one batch report row from a get_batch_report_data team."""
+    team_get = team.get
+    row = {
+        "teamId": team["id"],
+        "rank": rank,
+        "teamName": team["team_name"],
+        "healthStatus": team_get("health_status", "on_track"),
+        "mentorId": team_get("mentor_id"),
+        "lastAnalyzed": team_get("last_analyzed_at")
+    }
     
-    # Calculate summary statistics
-    total_teams = len(teams)
+    # Not analyzed yet (every team, right after a batch is created): zero the
+    # scores without going through _analysis at all
+    if not team_get("analysis_result"):
+        row.update(_ZERO_BATCH_SCORES)
+        row["frameworks"] = []
+        return row
+    
+    # Projects table has been dropped - analysis data is now in teams table
+    # Bind the bound method once; this runs for every team in the batch
+    ar_get = _analysis(team).get
+    
+    row.update({
+        "totalScore": ar_get("totalScore", 0),
+        "qualityScore": ar_get("qualityScore", 0),
+        "securityScore": ar_get("securityScore", 0),
+        "originalityScore": ar_get("originalityScore", 0),
+        "architectureScore": ar_get("architectureScore", 0),
+        "documentationScore": ar_get("documentationScore", 0),
+        "frameworks": ar_get("frameworks", [])
+    })
+    return row
+
+
+def _iter_batch_rows(teams: list) -> Iterator[dict]:
+    """
+    Yield batch report rows in rank order. The RPC returns teams ordered by
+    total score (migration 021), so the rank is simply the position.
+    """
+    for idx, team in enumerate(teams):
+        yield _batch_team_row(idx + 1, team)
+
+
+def _batch_insights(aggregates: dict) -> dict:
+    """Build the insights block from the get_batch_report_data aggregates."""
+    return {
+        "mostUsedTech": aggregates.get("mostUsedTech") or "Unknown",
+        "averageAiUsage": round(float(aggregates.get("averageAiUsage") or 0), 2),
+        "totalSecurityIssues": int(aggregates.get("totalSecurityIssues") or 0)
+    }
+
+
+def _stream_batch_report(head: dict, teams: list, insights: dict, cache_key: str, updated_at: str) -> Iterator[bytes]:
+    """
+    Yield the JSON batch report one team row at a time instead of encoding a
+    single multi-MB body, in BatchReportResponse field order. The chunks sent
+    are cached, joined, once the last one has gone out.
+    """
+    # Encode each piece through the response models' adapters so the streamed
+    # body matches what BatchReportResponse would have produced
+    chunks = [
+        b'{"batchId":' + orjson.dumps(head["batchId"])
+        + b',"batchName":' + orjson.dumps(head["batchName"])
+        + b',"generatedAt":' + orjson.dumps(head["generatedAt"])
+        + b',"summary":' + _dump(_BATCH_SUMMARY_ADAPTER, head["summary"])
+        + b',"teams":['
+    ]
+    yield chunks[0]
+    for idx, row in enumerate(_iter_batch_rows(teams)):
+        chunk = (b"," if idx else b"") + _dump(_BATCH_TEAM_ADAPTER, row)
+        chunks.append(chunk)
+        yield chunk
+    
+    chunks.append(b'],"insights":' + _dump(_BATCH_INSIGHTS_ADAPTER, insights) + b"}")
+    yield chunks[-1]
+    
+    # Cache the encoded report with its version; the TTL is only a safety net
+    body = b"".join(chunks).decode()
+    cache.set(cache_key, {"updatedAt": updated_at, "body": body}, RedisCache.TTL_REPORT)
+
+
+class _LineBuffer:
+    """Write target for csv writers that keeps only the last line written."""
     
-    # Get scores from teams that have been analyzed
-    scores = []
+    def write(self, line: str) -> None:
+        self.line = line
+
+
+def _iter_batch_csv(teams: list) -> Iterator[str]:
+    """
+    Yield the batch CSV export line by line, straight from the ranked RPC
+    teams (students embedded per team), so the file is never held in memory.
+    Rows are tuples in BATCH_CSV_FIELDS order: the team's leading and
+    trailing columns are built once and wrapped around each student's.
+    """
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer)
+    writer.writerow(BATCH_CSV_FIELDS)
+    yield buffer.line
+    
+    for idx, team_row in enumerate(teams):
+        team = _batch_team_row(idx + 1, team_row)
+        students = team_row.get("students")
+        
+        head = (team["rank"], team["teamName"])
+        tail = (
+            round(team["totalScore"], 2),
+            round(team["qualityScore"], 2),
+            round(team["securityScore"], 2),
+            round(team["originalityScore"], 2),
+            round(team["architectureScore"], 2),
+            round(team["documentationScore"], 2),
+            team["healthStatus"],
+            "N/A",
+            team["mentorId"],
+            ", ".join(team["frameworks"])
+        )
+        
+        if not isinstance(students, list) or not students:
+            # Write one row for the team if no students
+            writer.writerow(head + _NO_STUDENT_COLUMNS + tail)
+            yield buffer.line
+            continue
+        
+        for student in students:
+            round_one = (student.get("grading_details") or {}).get("round_1") or {}
+            writer.writerow(head + (
+                student.get("name"),
+                student.get("email"),
+                student.get("admin_grade", ""),
+                student.get("admin_feedback", ""),
+                round_one.get("grade", ""),
+                round_one.get("feedback", "")
+            ) + tail)
+            yield buffer.line
+
+
+def _mentor_report_body(teams: list) -> dict:
+    """Build the teams list and summary of a mentor report (plain function, run in a worker thread)."""
     teams_data = []
+    scores = []
     
-    for idx, team in enumerate(teams):
-        # Projects table has been dropped - analysis data is now in teams table
-        analysis_result = team.get("analysis_result", {})
-        if isinstance(analysis_result, str):
-            try:
-                analysis_result = json.loads(analysis_result)
-            except:
-                analysis_result = {}
-        
-        total_score = analysis_result.get("totalScore", 0)
+    for team in teams:
+        # Projects table has been dropped - analysis data is now in teams
+        # table; the scores come pre-extracted (null when missing)
+        total_score = team.get("total_score") or 0
         if total_score > 0:
             scores.append(total_score)
         
         teams_data.append({
             "teamId": team["id"],
-            "rank": idx + 1,  # Will be re-ranked after sorting
             "teamName": team["team_name"],
+            "batchId": team["batch_id"],
             "totalScore": total_score,
-            "qualityScore": analysis_result.get("qualityScore", 0),
-            "securityScore": analysis_result.get("securityScore", 0),
-            "originalityScore": analysis_result.get("originalityScore", 0),
-            "architectureScore": analysis_result.get("architectureScore", 0),
-            "documentationScore": analysis_result.get("documentationScore", 0),
+            "qualityScore": team.get("quality_score") or 0,
+            "securityScore": team.get("security_score") or 0,
             "healthStatus": team.get("health_status", "on_track"),
-            "mentorId": team.get("mentor_id"),
-            "frameworks": analysis_result.get("frameworks", []),
             "lastAnalyzed": team.get("last_analyzed_at")
         })
     
-    # Sort teams by total score descending
-    teams_data.sort(key=lambda x: x["totalScore"], reverse=True)
-    
-    # Update ranks
-    for idx, team in enumerate(teams_data):
-        team["rank"] = idx + 1
-    
     # Calculate summary
     average_score = sum(scores) / len(scores) if scores else 0
-    top_team = teams_data[0] if teams_data else None
+    health_counts = Counter(row["healthStatus"] for row in teams_data)
     
-    # Get most used technologies
-    all_frameworks = []
-    total_ai_usage = []
-    
-    for team_data in teams_data:
-        frameworks = team_data.get("frameworks", [])
-        if isinstance(frameworks, list):
-            all_frameworks.extend(frameworks)
-    
-    # Count framework occurrences
-    framework_counts = {}
-    for fw in all_frameworks:
-        framework_counts[fw] = framework_counts.get(fw, 0) + 1
+    return {
+        "teams": teams_data,
+        "summary": {
+            "totalTeams": len(teams),
+            "averageScore": round(average_score, 2),
+            "teamsOnTrack": health_counts["on_track"],
+            "teamsAtRisk": health_counts["at_risk"],
+            "teamsCritical": health_counts["critical"]
+        }
+    }
+
+
+@router.get("/batch/{batchId}", response_model=BatchReportResponse)
+async def get_batch_report(
+    request: Request,
+    batchId: str = Path(..., description="Batch ID"),
+    format: Optional[str] = Query("json", description="Format: json, pdf, or csv"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Generate batch-wide report.
+    Admin only.
+    """
+    # Check admin role
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
     
-    most_used_tech = max(framework_counts, key=framework_counts.get) if framework_counts else "Unknown"
+    # Cached JSON reports are stored with the batches.updated_at they were
+    # built from. The team-count trigger (migration 017) rewrites the batch
+    # row on every teams write, so a matching version means nothing changed.
+    cache_key = f"hackeval:report:batch:{batchId}"
+    cached_entry = cache.get(cache_key) if format == "json" else None
+    cached_body = cached_entry.get("body") if cached_entry else None
     
-    # Get AI usage statistics from teams (projects table has been dropped)
-    for team in teams:
-        analysis_result = team.get("analysis_result", {})
-        if isinstance(analysis_result, str):
-            try:
-                analysis_result = json.loads(analysis_result)
-            except:
-                analysis_result = {}
-        
-        ai_percentage = analysis_result.get("aiGeneratedPercentage", 0)
-        if ai_percentage > 0:
-            total_ai_usage.append(ai_percentage)
+    supabase = get_supabase()
     
-    average_ai_usage = sum(total_ai_usage) / len(total_ai_usage) if total_ai_usage else 0
+    # Batch header + team rows in one round trip (migration 019). Students are
+    # only embedded for the CSV export, the only format that lists them; team
+    # rows are omitted entirely when the cached version is still current.
+    # Projects table has been dropped - all analysis data is now in teams table
+    bundle = supabase.rpc("get_batch_report_data", {
+        "p_batch_id": batchId,
+        "p_known_updated_at": cached_entry.get("updatedAt") if cached_body else None,
+        "p_include_students": format == "csv"
+    }).execute().data
+    if not bundle:
+        raise HTTPException(status_code=404, detail="Batch not found")
     
-    # Count security issues (projects table has been dropped)
-    total_security_issues = 0
-    for team in teams:
-        analysis_result = team.get("analysis_result", {})
-        if isinstance(analysis_result, str):
-            try:
-                analysis_result = json.loads(analysis_result)
-            except:
-                analysis_result = {}
-        
-        security_issues = analysis_result.get("securityIssues", [])
-        total_security_issues += len(security_issues) if isinstance(security_issues, list) else 0
+    batch = bundle["batch"]
     
-    # Build response
-    report = {
+    # Same batches.updated_at, same report (only generatedAt can differ), so
+    # the version makes a weak ETag the browser can revalidate with
+    headers = {"Cache-Control": REPORT_CACHE_CONTROL, "ETag": weak_etag(batch["updated_at"])}
+    if format == "json":
+        not_modified = check_not_modified(request, headers["ETag"], headers)
+        if not_modified:
+            return not_modified
+    
+    if cached_body and bundle["teams"] is None:
+        return _body_response(cached_body, headers)
+    
+    teams = bundle["teams"] or []
+    # Average score, average AI usage, security issue total (migration 020)
+    # and most used tech (migration 023) are computed by the RPC; Python only
+    # builds the per-team rows
+    aggregates = bundle.get("aggregates") or {}
+    insights = _batch_insights(aggregates)
+    
+    # Calculate summary - teams arrive ranked, so the first one is the top
+    # team; only its name and score are needed, not a whole report row
+    average_score = float(aggregates.get("averageScore") or 0)
+    top_team = teams[0] if teams else None
+    
+    head = {
         "batchId": batchId,
         "batchName": batch["name"],
         "generatedAt": datetime.utcnow().isoformat(),
         "summary": {
-            "totalTeams": total_teams,
+            "totalTeams": len(teams),
             "averageScore": round(average_score, 2),
-            "topTeam": top_team["teamName"] if top_team else "N/A",
-            "topScore": top_team["totalScore"] if top_team else 0
-        },
-        "teams": teams_data,
-        "insights": {
-            "mostUsedTech": most_used_tech,
-            "averageAiUsage": round(average_ai_usage, 2),
-            "totalSecurityIssues": total_security_issues
+            "topTeam": top_team["team_name"] if top_team else "N/A",
+            "topScore": _analysis(top_team).get("totalScore", 0) if top_team else 0
         }
     }
     
-    # Handle different formats
+    if format == "json":
+        return StreamingResponse(
+            _stream_batch_report(head, teams, insights, cache_key, batch["updated_at"]),
+            media_type="application/json",
+            headers=headers
+        )
+    
+    if format == "csv":
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"batch_report_{batchId}_{timestamp}.csv"
+        # Rows are written as they are produced, so the file is never held
+        # in memory; Starlette iterates the sync generator in its threadpool
+        return StreamingResponse(
+            _iter_batch_csv(teams),
+            media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+    
+    # The PDF export needs the whole report at once. Building the rows is
+    # CPU-bound, so it runs in a worker thread; the JSON and CSV streams above
+    # get the same treatment from Starlette, which iterates sync generators
+    # off-loop.
+    teams_data = await asyncio.to_thread(list, _iter_batch_rows(teams))
+    
+    report = {
+        **head,
+        "teams": teams_data,
+        "insights": insights
+    }
+    
     if format == "pdf":
         # In production, generate PDF using ReportLab or similar
         return JSONResponse(
@@ -178,96 +434,15 @@ async def get_batch_report(
                 "data": report
             }
         )
-    elif format == "csv":
-        import csv
-        import io
-        from fastapi.responses import StreamingResponse
-
-        output = io.StringIO()
-        # Updated CSV format to include student details
-        writer = csv.DictWriter(output, fieldnames=[
-            "Rank", "Team Name", "Student Name", "Student Email", 
-            "Admin Grade", "Admin Feedback", 
-            "Mentor Grade", "Mentor Feedback",
-            "Total Score", "Quality", "Security", "Originality", "Architecture", 
-            "Documentation", "Health Status", "Verdict", "Mentor", "Frameworks"
-        ])
-        
-        writer.writeheader()
-        
-        # Build a map of team_id -> students for O(1) lookup (already fetched in teams query)
-        team_students_map = {}
-        for team in teams:
-            team_id = team.get("id")
-            students = team.get("students", [])
-            team_students_map[team_id] = students if isinstance(students, list) else []
-        
-        for team in teams_data:
-            # Use pre-fetched students from the map (no additional queries!)
-            team_id = team.get("teamId")
-            students = team_students_map.get(team_id, [])
-            
-            base_row = {
-                "Rank": team.get("rank"),
-                "Team Name": team.get("teamName"),
-                "Total Score": round(team.get("totalScore", 0), 2),
-                "Quality": round(team.get("qualityScore", 0), 2),
-                "Security": round(team.get("securityScore", 0), 2),
-                "Originality": round(team.get("originalityScore", 0), 2),
-                "Architecture": round(team.get("architectureScore", 0), 2),
-                "Documentation": round(team.get("documentationScore", 0), 2),
-                "Health Status": team.get("healthStatus"),
-                "Verdict": "N/A",
-                "Mentor": team.get("mentorId", "Unassigned"),
-                "Frameworks": ", ".join(team.get("frameworks", []))
-            }
-            
-            if not students:
-                # Write one row for the team if no students
-                row = base_row.copy()
-                row.update({
-                    "Student Name": "N/A",
-                    "Student Email": "N/A",
-                    "Admin Grade": "N/A",
-                    "Admin Feedback": "N/A",
-                    "Mentor Grade": "N/A",
-                    "Mentor Feedback": "N/A"
-                })
-                writer.writerow(row)
-            else:
-                for student in students:
-                    round_one = (student.get("grading_details") or {}).get("round_1") or {}
-                    row = base_row.copy()
-                    row.update({
-                        "Student Name": student.get("name"),
-                        "Student Email": student.get("email"),
-                        "Admin Grade": student.get("admin_grade", ""),
-                        "Admin Feedback": student.get("admin_feedback", ""),
-                        "Mentor Grade": round_one.get("grade", ""),
-                        "Mentor Feedback": round_one.get("feedback", "")
-                    })
-                    writer.writerow(row)
-            
-        output.seek(0)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"batch_report_{batchId}_{timestamp}.csv"
-    # Cache the JSON response for 2 minutes
-    if format == "json":
-        cache.set(f"hackeval:report:batch:{batchId}", report, RedisCache.TTL_SHORT)
-    
-        
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
     
-    return report
+    # Unknown formats get the plain (uncached) JSON report; JSON requests
+    # were streamed and cached above
+    return _json_response(_BATCH_REPORT_ADAPTER, report)
 
 
 @router.get("/mentor/{mentorId}", response_model=MentorReportResponse)
 async def get_mentor_report(
+    request: Request,
     mentorId: str = Path(..., description="Mentor ID"),
     batchId: Optional[str] = Query(None, description="Filter by batch ID"),
     format: Optional[str] = Query("json", description="Format: json or pdf"),
@@ -277,8 +452,8 @@ async def get_mentor_report(
     Generate report for mentor's assigned teams.
     Admin or the mentor themselves can access.
     """
-    role = current_user.get("role")
-    user_id = current_user.get("user_id")
+    role = current_user.role
+    user_id = str(current_user.user_id)
     
     # Check authorization
     if role != "admin" and user_id != mentorId:
@@ -287,35 +462,51 @@ async def get_mentor_report(
             detail="You can only access your own reports"
         )
     
-    # Check cache first (skip for PDF exports)
+    # Check cache first (skip for PDF exports). Entries are tagged with the
+    # mentor's revision, which assignment changes bump, so one INCR drops the
+    # report for every batch filter at once
+    cache_key = f"hackeval:report:mentor:{mentorId}:{batchId or 'all'}"
+    rev = 0
     if format == "json":
-        cache_key = f"hackeval:report:mentor:{mentorId}:{batchId or 'all'}"
-        cached_result = cache.get(cache_key)
-        if cached_result:
-            return cached_result
+        cached_body, rev = cache.get_versioned(cache_key, f"hackeval:rev:mentor:{mentorId}")
+        if isinstance(cached_body, str):
+            # Hits return the cached bytes unchanged, so the body itself is
+            # a stable ETag
+            headers = {"ETag": weak_etag(cached_body)}
+            return check_not_modified(request, headers["ETag"], headers) or _body_response(cached_body, headers)
     
     supabase = get_supabase()
     
+    def fetch_mentor_team_ids() -> Optional[list]:
+        # 1. Get IDs using centralized logic; None marks a failed lookup
+        try:
+            from ..crud import TeamCRUD
+            return TeamCRUD.get_mentor_team_ids(mentorId, strict=True)
+        except Exception:
+            logger.exception("Error getting mentor teams for %s", mentorId)
+            return None
+    
+    # The mentor lookup and the assignment lookup are independent, so run the
+    # (blocking) Supabase calls side by side instead of back to back
+    mentor_response, mentor_team_ids = await asyncio.gather(
+        asyncio.to_thread(
+            lambda: supabase.table("users").select("id, full_name").eq("id", mentorId).execute()
+        ),
+        asyncio.to_thread(fetch_mentor_team_ids)
+    )
+    
     # Verify mentor exists
-    mentor_response = supabase.table("users").select("*").eq("id", mentorId).execute()
     if not mentor_response.data:
         raise HTTPException(status_code=404, detail="Mentor not found")
     
     mentor = mentor_response.data[0]
     
-    # Get mentor's assigned teams
-    mentor_team_ids = []
-    
-    # 1. Get IDs using centralized logic
-    try:
-        from ..crud import TeamCRUD
-        mentor_team_ids = TeamCRUD.get_mentor_team_ids(mentorId)
-    except Exception as e:
-        print(f"[Reports] Error getting mentor teams: {e}")
-        
     if not mentor_team_ids:
-        # If no teams assigned, return empty report
-        return {
+        # If no teams assigned, return empty report. It is cached like any
+        # other mentor report (assignment changes bump the revision), but for
+        # longer, so repeat visits skip the mentor and assignment lookups.
+        # An empty report standing in for a failed lookup is not cached
+        body = _dump(_MENTOR_REPORT_ADAPTER, {
             "mentorId": mentorId,
             "mentorName": mentor.get("full_name", ""),
             "generatedAt": datetime.utcnow().isoformat(),
@@ -327,11 +518,14 @@ async def get_mentor_report(
                 "teamsAtRisk": 0,
                 "teamsCritical": 0
             }
-        }
+        })
+        if format == "json" and mentor_team_ids is not None:
+            cache.set_versioned(cache_key, body.decode(), rev, RedisCache.TTL_MEDIUM)
+        return _body_response(body, {"ETag": weak_etag(body)})
 
-    # 2. Fetch full team data for these IDs (include students in single query)
+    # 2. Fetch the report columns for these IDs (students are not part of this report)
     # Projects table has been dropped - all analysis data is now in teams table
-    query = supabase.table("teams").select("*, students(*)").in_("id", mentor_team_ids)
+    query = supabase.table("teams").select(MENTOR_REPORT_TEAM_COLUMNS).in_("id", mentor_team_ids)
     
     if batchId:
         query = query.eq("batch_id", batchId)
@@ -339,60 +533,14 @@ async def get_mentor_report(
     teams_response = query.execute()
     teams = teams_response.data or []
     
-    # Process teams data
-    teams_data = []
-    scores = []
-    on_track_count = 0
-    at_risk_count = 0
-    critical_count = 0
-    
-    for team in teams:
-        # Projects table has been dropped - analysis data is now in teams table
-        analysis_result = team.get("analysis_result", {})
-        if isinstance(analysis_result, str):
-            try:
-                analysis_result = json.loads(analysis_result)
-            except:
-                analysis_result = {}
-        
-        total_score = analysis_result.get("totalScore", 0)
-        if total_score > 0:
-            scores.append(total_score)
-        
-        health_status = team.get("health_status", "on_track")
-        if health_status == "on_track":
-            on_track_count += 1
-        elif health_status == "at_risk":
-            at_risk_count += 1
-        elif health_status == "critical":
-            critical_count += 1
-        
-        teams_data.append({
-            "teamId": team["id"],
-            "teamName": team["team_name"],
-            "batchId": team["batch_id"],
-            "totalScore": total_score,
-            "qualityScore": analysis_result.get("qualityScore", 0),
-            "securityScore": analysis_result.get("securityScore", 0),
-            "healthStatus": health_status,
-            "lastAnalyzed": team.get("last_analyzed_at")
-        })
-    
-    # Calculate summary
-    average_score = sum(scores) / len(scores) if scores else 0
+    # Per-team processing is CPU-bound; keep it off the event loop
+    body = await asyncio.to_thread(_mentor_report_body, teams)
     
     report = {
         "mentorId": mentorId,
         "mentorName": mentor.get("full_name", ""),
         "generatedAt": datetime.utcnow().isoformat(),
-        "teams": teams_data,
-        "summary": {
-            "totalTeams": len(teams),
-            "averageScore": round(average_score, 2),
-            "teamsOnTrack": on_track_count,
-            "teamsAtRisk": at_risk_count,
-            "teamsCritical": critical_count
-        }
+        **body
     }
     
     # Handle PDF format
@@ -404,34 +552,32 @@ async def get_mentor_report(
             }
         )
     
-    # Cache the JSON response for 2 minutes
+    body = _dump(_MENTOR_REPORT_ADAPTER, report)
+    
+    # Cache the encoded response under the revision it was built from
     if format == "json":
-        cache.set(f"hackeval:report:mentor:{mentorId}:{batchId or 'all'}", report, RedisCache.TTL_SHORT)
+        cache.set_versioned(cache_key, body.decode(), rev, RedisCache.TTL_SHORT)
     
-    return report
+    return _body_response(body, {"ETag": weak_etag(body)})
 
 
 @router.get("/team/{teamId}", response_model=TeamReportResponse)
 async def get_team_report(
+    request: Request,
     teamId: str = Path(..., description="Team ID"),
     format: Optional[str] = Query("json", description="Format: json or pdf"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum contributors to include"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Generate detailed team report.
     Admin or assigned mentor only.
     """
-    # Check cache first (skip for PDF exports)
-    if format == "json":
-        cache_key = f"hackeval:report:team:{teamId}"
-        cached_result = cache.get(cache_key)
-        if cached_result:
-            return cached_result
-    
     supabase = get_supabase()
     
-    # Get team data (projects table has been dropped - all analysis data is now in teams table)
-    team_response = supabase.table("teams").select("*").eq("id", teamId).execute()
+    # Get team data (projects table has been dropped - all analysis data is now in teams table).
+    # The view (migration 025) trims analysis_result to the keys used below
+    team_response = supabase.table("team_report_view").select(TEAM_REPORT_COLUMNS).eq("id", teamId).execute()
     if not team_response.data:
         raise HTTPException(status_code=404, detail="Team not found")
     
@@ -447,14 +593,30 @@ async def get_team_report(
             detail="Access denied. You can only view reports for teams assigned to you."
         )
     
+    # Check cache (skip for PDF exports) - keyed by teams.updated_at so any
+    # write to the team yields a fresh report, and only after authorization
+    # The same version also makes a weak ETag for browser revalidation
+    version = f"{team.get('updated_at')}:{limit}"
+    cache_key = f"hackeval:report:team:{teamId}:{version}"
+    headers = {"Cache-Control": REPORT_CACHE_CONTROL, "ETag": weak_etag(version)}
+    if format == "json":
+        not_modified = check_not_modified(request, headers["ETag"], headers)
+        if not_modified:
+            return not_modified
+        cached_body = cache.get(cache_key)
+        if isinstance(cached_body, str):
+            return _body_response(cached_body, headers)
+    
     # Projects table has been dropped - check if team has been analyzed
-    analysis_result = team.get("analysis_result")
+    analysis_result = _analysis(team)
     
     if not analysis_result:
-        # Return basic team info if not analyzed
-        return {
+        # Return basic team info if not analyzed. Teams waiting for analysis
+        # are polled the most, so this report is cached and carries the
+        # ETag like any other
+        report = {
             "teamId": teamId,
-            "teamName": team["name"],
+            "teamName": team["team_name"],
             "batchId": team["batch_id"],
             "generatedAt": datetime.utcnow().isoformat(),
             "analysis": {
@@ -472,42 +634,43 @@ async def get_team_report(
             "codeMetrics": {
                 "totalFiles": 0,
                 "totalLinesOfCode": 0,
-                "languages": []
+                "languages": [],
+                "techStack": [],
+                "architecturePattern": _TEAM_DEFAULTS["architecturePattern"]
             },
             "security": {
                 "score": 0,
-                "issues": []
+                "issues": [],
+                "secretsDetected": 0
             },
             "healthStatus": team.get("health_status", "on_track"),
             "lastAnalyzedAt": None
         }
-    
-    # Parse analysis result from teams table
-    analysis_result = team.get("analysis_result", {})
-    
-    if isinstance(analysis_result, str):
-        try:
-            analysis_result = json.loads(analysis_result)
-        except:
-            analysis_result = {}
+        if format != "json":
+            return report
+        body = _dump(_TEAM_REPORT_ADAPTER, report)
+        cache.set(cache_key, body.decode(), RedisCache.TTL_REPORT)
+        return _body_response(body, headers)
     
     # Extract data
-    commit_forensics = analysis_result.get("commitForensics", {})
-    contributors = commit_forensics.get("contributors", [])
+    ar = {**_TEAM_DEFAULTS, **analysis_result}
+    commit_forensics = ar["commitForensics"]
+    # Dashboards only show the top contributors; large repos can have hundreds
+    contributors = commit_forensics.get("contributors", [])[:limit]
     
     # Build comprehensive report (same as analytics endpoint)
     report = {
         "teamId": teamId,
-        "teamName": team["name"],
+        "teamName": team["team_name"],
         "batchId": team["batch_id"],
         "generatedAt": datetime.utcnow().isoformat(),
         "analysis": {
-            "totalScore": analysis_result.get("totalScore", 0),
-            "qualityScore": analysis_result.get("qualityScore", 0),
-            "securityScore": analysis_result.get("securityScore", 0),
-            "originalityScore": analysis_result.get("originalityScore", 0),
-            "architectureScore": analysis_result.get("architectureScore", 0),
-            "documentationScore": analysis_result.get("documentationScore", 0)
+            "totalScore": ar["totalScore"],
+            "qualityScore": ar["qualityScore"],
+            "securityScore": ar["securityScore"],
+            "originalityScore": ar["originalityScore"],
+            "architectureScore": ar["architectureScore"],
+            "documentationScore": ar["documentationScore"]
         },
         "commits": {
             "total": commit_forensics.get("totalCommits", 0),
@@ -522,22 +685,22 @@ async def get_team_report(
             ]
         },
         "codeMetrics": {
-            "totalFiles": analysis_result.get("totalFiles", 0),
-            "totalLinesOfCode": analysis_result.get("totalLinesOfCode", 0),
-            "languages": analysis_result.get("languages", []),
-            "techStack": analysis_result.get("frameworks", []),
-            "architecturePattern": analysis_result.get("architecturePattern", "Unknown")
+            "totalFiles": ar["totalFiles"],
+            "totalLinesOfCode": ar["totalLinesOfCode"],
+            "languages": ar["languages"],
+            "techStack": ar["frameworks"],
+            "architecturePattern": ar["architecturePattern"]
         },
         "security": {
-            "score": analysis_result.get("securityScore", 0),
-            "issues": analysis_result.get("securityIssues", []),
-            "secretsDetected": analysis_result.get("secretsDetected", 0)
+            "score": ar["securityScore"],
+            "issues": ar["securityIssues"],
+            "secretsDetected": ar["secretsDetected"]
         },
         "aiAnalysis": {
-            "aiGeneratedPercentage": analysis_result.get("aiGeneratedPercentage", 0),
-            "verdict": analysis_result.get("aiVerdict", "Unknown"),
-            "strengths": analysis_result.get("strengths", []),
-            "improvements": analysis_result.get("improvements", [])
+            "aiGeneratedPercentage": ar["aiGeneratedPercentage"],
+            "verdict": ar["aiVerdict"],
+            "strengths": ar["strengths"],
+            "improvements": ar["improvements"]
         },
         "healthStatus": team.get("health_status", "on_track"),
         "riskFlags": team.get("risk_flags", []),
@@ -553,10 +716,10 @@ async def get_team_report(
             }
         )
     
-    # Cache the JSON response for 2 minutes
-    if format == "json":
-        cache.set(f"hackeval:report:team:{teamId}", report, RedisCache.TTL_SHORT)
+    body = _dump(_TEAM_REPORT_ADAPTER, report)
     
-    return report
+    # Cache the encoded response; the TTL is only a safety net for the versioned key
+    if format == "json":
+        cache.set(cache_key, body.decode(), RedisCache.TTL_REPORT)
     
-    return report
+    return _body_response(body, headers)
@@ -225,7 +225,7 @@ class AnalysisResultResponse(BaseModel):
 class LeaderboardItem(BaseModel):
     """Leaderboard item"""
     rank: int
-    id: UUID
+    id: str  # PostgREST already returns canonical UUID strings
     repo_url: str
     team_name: Optional[str] = None
     total_score: float
@@ -832,6 +832,7 @@ class TeamListResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
 
 
 class BulkUploadResponse(BaseModel):
@@ -361,6 +361,9 @@ class DataMapper:
                                 supabase.table("analysis_snapshots").insert(snapshot_data).execute()
                                 batch_logger.info(f"Created analysis snapshot for team {team_id}, run {run_number}")
                             
+                            # Invalidate the cached weekly progress series
+                            cache.incr(f"hackeval:rev:progress:{team_id}")
+                            
                             # Update batch run statistics
                             completed_count = supabase.table("analysis_snapshots")\
                                 .select("id", count="exact")\
@@ -5,12 +5,24 @@ Provides caching for API responses using Upstash Redis
 import os
 import json
 import hashlib
-from typing import Any, Optional, Callable
+import orjson
+from typing import Any, Optional, Callable, Tuple
 from functools import wraps
 import redis
 from datetime import timedelta
 
 
+def _loads(data):
+    """
+    Decode a cached value. set() encodes with the stdlib, which writes NaN and
+    Infinity; orjson rejects those, so such values take the stdlib path.
+    """
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data)
+
+
 class RedisCache:
     """Redis cache client for API caching"""
     
@@ -20,6 +32,7 @@ class RedisCache:
     
     # Cache TTL settings (in seconds)
     TTL_SHORT = 30          # 30 seconds - for frequently changing data
+    TTL_REPORT = 60         # 1 minute - safety net for version-keyed reports
     TTL_MEDIUM = 300        # 5 minutes - for moderately changing data
     TTL_LONG = 3600         # 1 hour - for stable data
     TTL_VERY_LONG = 86400   # 24 hours - for rarely changing data
@@ -101,7 +114,7 @@ class RedisCache:
         try:
             data = self._client.get(key)
             if data:
-                return json.loads(data)
+                return _loads(data)
             return None
         except Exception as e:
             print(f"⚠️  Cache get error: {e}")
@@ -120,6 +133,43 @@ class RedisCache:
             print(f"⚠️  Cache set error: {e}")
             return False
     
+    def get_versioned(self, key: str, rev_key: str) -> Tuple[Optional[Any], int]:
+        """
+        Get a value stored with set_versioned together with the current
+        revision of rev_key, in one MGET. The value is only returned when it
+        was stored under the current revision, so bumping rev_key with incr
+        invalidates every key versioned by it at once.
+        """
+        if not self._client:
+            return None, 0
+        
+        try:
+            data, rev = self._client.mget(key, rev_key)
+            rev = int(rev or 0)
+            if data:
+                entry = _loads(data)
+                if entry.get("rev") == rev:
+                    return entry.get("value"), rev
+            return None, rev
+        except Exception as e:
+            print(f"⚠️  Cache get versioned error: {e}")
+            return None, 0
+    
+    def set_versioned(self, key: str, value: Any, rev: int, ttl: int = TTL_MEDIUM) -> bool:
+        """Set value in cache tagged with the revision it was built from"""
+        return self.set(key, {"rev": rev, "value": value}, ttl)
+    
+    def incr(self, key: str) -> int:
+        """Bump a revision counter, invalidating values versioned by it"""
+        if not self._client:
+            return 0
+        
+        try:
+            return self._client.incr(key)
+        except Exception as e:
+            print(f"⚠️  Cache incr error: {e}")
+            return 0
+    
     def delete(self, key: str) -> bool:
         """Delete key from cache"""
         if not self._client:
@@ -132,6 +182,17 @@ class RedisCache:
             print(f"⚠️  Cache delete error: {e}")
             return False
     
+    def delete_many(self, *keys: str) -> int:
+        """Delete several keys in a single round trip (DEL is variadic)"""
+        if not self._client or not keys:
+            return 0
+        
+        try:
+            return self._client.delete(*keys)
+        except Exception as e:
+            print(f"⚠️  Cache delete many error: {e}")
+            return 0
+    
     def delete_pattern(self, pattern: str) -> int:
         """Delete all keys matching pattern"""
         if not self._client:
@@ -0,0 +1,26 @@
+"""
+HTTP Cache Utility
+ETag helpers for endpoints that let clients revalidate instead of refetching
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def weak_etag(version) -> str:
+    """Weak ETag for a response version (a row timestamp or the encoded body)."""
+    if isinstance(version, str):
+        version = version.encode()
+    return f'W/"{hashlib.md5(version).hexdigest()}"'
+
+
+def check_not_modified(request: Request, etag: str, headers: dict) -> Optional[Response]:
+    """Return a 304 when the client's If-None-Match already holds etag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        return Response(status_code=304, headers=headers)
+    return None
@@ -1,7 +1,8 @@
 
 import os
+import queue
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from datetime import datetime
 
 # Ensure logs directory exists
@@ -10,6 +11,9 @@ os.makedirs(LOG_DIR, exist_ok=True)
 
 LOG_FILE = os.path.join(LOG_DIR, "batch_debug.log")
 
+LOG_FORMAT = '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
 def get_logger(name="batch_processor"):
     """
     Get a configured logger that writes to both console and file
@@ -21,10 +25,7 @@ def get_logger(name="batch_processor"):
         logger.setLevel(logging.INFO)
         
         # Formatter
-        formatter = logging.Formatter(
-            '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
         
         # File Handler (Rotating, max 10MB, keep 5 backups)
         file_handler = RotatingFileHandler(
@@ -40,8 +41,28 @@ def get_logger(name="batch_processor"):
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
         logger.addHandler(console_handler)
+        
+        # Fully handled here; do not repeat records through the root logger
+        logger.propagate = False
     
     return logger
 
+
+def start_queue_logging() -> QueueListener:
+    """
+    Route root-logger records (module loggers such as the routers') through
+    a queue, so a request only enqueues the record and a listener thread
+    does the blocking console write. Stop the returned listener on shutdown.
+    """
+    log_queue = queue.SimpleQueue()
+    
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
+    
+    listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    logging.getLogger().addHandler(QueueHandler(log_queue))
+    listener.start()
+    return listener
+
 # Global instance
 batch_logger = get_logger()
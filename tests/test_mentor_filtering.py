@@ -76,7 +76,7 @@ async def test_get_mentor_report_filtering(mock_reports_supabase):
         )
         
         # 4. Verify
-        mock_get_ids.assert_called_once_with(mentor_id)
+        mock_get_ids.assert_called_once_with(mentor_id, strict=True)
         
         # Verify Supabase was called
         # Check in_ call
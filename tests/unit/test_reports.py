@@ -0,0 +1,32 @@
+"""
+Unit Tests for Reports Router helpers
+"""
+from src.api.backend.routers.reports import _analysis
+
+
+class TestAnalysisHelper:
+    """Test analysis_result normalization"""
+    
+    def test_dict_passes_through(self):
+        """JSONB rows come back as dicts and are returned as-is"""
+        payload = {"totalScore": 80}
+        assert _analysis({"analysis_result": payload}) is payload
+    
+    def test_legacy_string_is_decoded(self):
+        """Pre-migration string payloads are decoded"""
+        assert _analysis({"analysis_result": '{"totalScore": 80}'}) == {"totalScore": 80}
+    
+    def test_legacy_string_is_decoded_once(self):
+        """The decoded payload replaces the string on the row"""
+        team = {"analysis_result": '{"totalScore": 80}'}
+        first = _analysis(team)
+        assert team["analysis_result"] is first
+        assert _analysis(team) is first
+    
+    def test_missing_or_invalid_payload_is_empty(self):
+        """Missing, malformed and non-object payloads become {}"""
+        assert _analysis({}) == {}
+        assert _analysis({"analysis_result": None}) == {}
+        assert _analysis({"analysis_result": "not json"}) == {}
+        assert _analysis({"analysis_result": "[1, 2]"}) == {}
+        assert _analysis({"analysis_result": [1, 2]}) == {}
@@ -0,0 +1,62 @@
+"""
+Unit Tests for Teams Router helpers
+"""
+from src.api.backend.routers.teams import _build_mentor_index, _match_mentor
+
+
+def _match(value, mentor_map):
+    return _match_mentor(value, mentor_map, *_build_mentor_index(mentor_map))
+
+
+class TestBuildMentorIndex:
+    """Test the bulk-import mentor index"""
+
+    def test_normalized_keys_drop_punctuation(self):
+        """Keys are indexed without spaces or punctuation"""
+        normalized, _ = _build_mentor_index({"dr. asha rao": "m1"})
+        assert normalized == {"drasharao": "m1"}
+
+    def test_token_index_skips_titles_domains_and_initials(self):
+        """Titles, email domains and single letters are not indexed"""
+        _, token_index = _build_mentor_index({
+            "dr. a kumar": "m1",
+            "kumar@uni.edu": "m1",
+        })
+        assert dict(token_index) == {"kumar": ["dr. a kumar", "kumar@uni.edu"]}
+
+
+class TestMatchMentor:
+    """Test bulk-import mentor cell resolution"""
+
+    def test_exact_and_normalized_keys(self):
+        """Exact keys win, then keys compared without punctuation"""
+        mentor_map = {"priya sharma": "m1", "p.sharma@uni.edu": "m1", "dr. kumar": "m2"}
+        assert _match("priya sharma", mentor_map) == "m1"
+        assert _match("priya-sharma", mentor_map) == "m1"
+        assert _match("dr kumar", mentor_map) == "m2"
+
+    def test_subset_of_name_tokens(self):
+        """A cell naming part of a mentor, or a mentor with a title, resolves"""
+        mentor_map = {"asha rao": "m1", "a.rao@uni.edu": "m1", "priya sharma": "m2"}
+        assert _match("rao", mentor_map) == "m1"
+        assert _match("prof. asha rao", mentor_map) == "m1"
+
+    def test_partial_overlap_is_not_a_match(self):
+        """Sharing one token, or only a title, does not pick a mentor"""
+        mentor_map = {"dr. kumar": "m1", "priya sharma": "m2"}
+        assert _match("dr. rao", mentor_map) is None
+        assert _match("prof. priya nair", mentor_map) is None
+        assert _match("sharma ravi", mentor_map) is None
+        assert _match("dr.", mentor_map) is None
+
+    def test_ambiguous_cell_is_not_a_match(self):
+        """A cell that fits two different mentors resolves to None"""
+        mentor_map = {"john smith": "m1", "john doe": "m2"}
+        assert _match("john", mentor_map) is None
+
+    def test_unknown_cell_is_not_a_match(self):
+        """Cells with no shared tokens, or only a shared domain, resolve to None"""
+        mentor_map = {"john.smith@uni.edu": "m1", "john smith": "m1"}
+        assert _match("someone else", mentor_map) is None
+        assert _match("uni.edu", mentor_map) is None
+        assert _match("smi", mentor_map) is None